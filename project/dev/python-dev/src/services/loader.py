@@ -10,10 +10,10 @@ from llama_index.readers.json import JSONReader
 from llama_index.readers.obsidian import ObsidianReader
 from llama_index.core.readers.string_iterable import StringIterableReader
 
-class DocumentLoader:
-    def __init__(self):        
-        self.logger = logging.getLogger(__name__)
+logger = logging.getLogger(__name__)
+
 
+class DocumentLoader:
     def load(self, source: str, source_type: str = "auto", **kwargs) -> List[Document]:
         """
         様々なソースからドキュメントを読み込み、List[Document]に変換する
@@ -61,7 +61,7 @@ class DocumentLoader:
                 raise ValueError(f"Unsupported source_type: {source_type}")
                 
         except Exception as e:
-            self.logger.error(f"Error loading documents from {source}: {str(e)}")
+            logger.error(f"Error loading documents from {source}: {str(e)}")
             raise
 
     def _auto_detect_and_load(self, source: str, **kwargs) -> List[Document]:
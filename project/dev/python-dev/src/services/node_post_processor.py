@@ -11,16 +11,18 @@ from db.database_manager import db_manager
 from llm.ollama_connector import OllamaConnector
 from configs import ProcessingConfig
 
+logger = logging.getLogger(__name__)
+
+
 class NodePostProcessor:
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
         self._postprocessors_cache: Dict[str, BaseNodePostprocessor] = {}
     
     def create_similarity_postprocessor(self, 
                                       similarity_cutoff: float = 0.7) -> SimilarityPostprocessor:
         """類似度による後処理器を作成"""
         try:
-            self.logger.info(f"Creating Similarity Postprocessor with cutoff: {similarity_cutoff}")
+            logger.info(f"Creating Similarity Postprocessor with cutoff: {similarity_cutoff}")
             
             postprocessor = SimilarityPostprocessor(
                 similarity_cutoff=similarity_cutoff
@@ -29,7 +31,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create Similarity Postprocessor: {e}")
+            logger.error(f"Failed to create Similarity Postprocessor: {e}")
             raise
     
     def create_keyword_postprocessor(self, 
@@ -37,7 +39,7 @@ class NodePostProcessor:
                                    exclude_keywords: Optional[List[str]] = None) -> KeywordNodePostprocessor:
         """キーワードによる後処理器を作成"""
         try:
-            self.logger.info("Creating Keyword Postprocessor")
+            logger.info("Creating Keyword Postprocessor")
             
             postprocessor = KeywordNodePostprocessor(
                 required_keywords=required_keywords or [],
@@ -47,7 +49,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create Keyword Postprocessor: {e}")
+            logger.error(f"Failed to create Keyword Postprocessor: {e}")
             raise
     
     def create_prev_next_postprocessor(self, 
@@ -56,7 +58,7 @@ class NodePostProcessor:
                                      mode: str = "both") -> PrevNextNodePostprocessor:
         """前後のノードを含める後処理器を作成"""
         try:
-            self.logger.info("Creating PrevNext Postprocessor")
+            logger.info("Creating PrevNext Postprocessor")
             
             if docstore is None:
                 docstore = db_manager.docstore
@@ -70,14 +72,14 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create PrevNext Postprocessor: {e}")
+            logger.error(f"Failed to create PrevNext Postprocessor: {e}")
             raise
     
     def create_metadata_replacement_postprocessor(self, 
                                                 target_key: str = "window") -> MetadataReplacementPostProcessor:
         """メタデータ置換後処理器を作成"""
         try:
-            self.logger.info("Creating Metadata Replacement Postprocessor")
+            logger.info("Creating Metadata Replacement Postprocessor")
             
             postprocessor = MetadataReplacementPostProcessor(
                 target_metadata_key=target_key
@@ -86,14 +88,14 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create Metadata Replacement Postprocessor: {e}")
+            logger.error(f"Failed to create Metadata Replacement Postprocessor: {e}")
             raise
     
     def create_pii_postprocessor(self, 
                                pii_node_info_type: str = "PII.PERSON") -> PIINodePostprocessor:
         """PII（個人識別情報）後処理器を作成"""
         try:
-            self.logger.info("Creating PII Postprocessor")
+            logger.info("Creating PII Postprocessor")
             
             postprocessor = PIINodePostprocessor(
                 pii_node_info_type=pii_node_info_type
@@ -102,7 +104,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create PII Postprocessor: {e}")
+            logger.error(f"Failed to create PII Postprocessor: {e}")
             raise
     
     def create_llm_rerank_postprocessor(self, 
@@ -110,7 +112,7 @@ class NodePostProcessor:
                                       choice_batch_size: int = 10) -> LLMRerank:
         """LLMによる再ランキング後処理器を作成"""
         try:
-            self.logger.info("Creating LLM Rerank Postprocessor")
+            logger.info("Creating LLM Rerank Postprocessor")
             
             postprocessor = LLMRerank(
                 top_n=top_n,
@@ -120,7 +122,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create LLM Rerank Postprocessor: {e}")
+            logger.error(f"Failed to create LLM Rerank Postprocessor: {e}")
             raise
     
     def create_sentence_embedding_optimizer(self, 
@@ -128,7 +130,7 @@ class NodePostProcessor:
                                           threshold_cutoff: float = 0.7) -> SentenceEmbeddingOptimizer:
         """文埋め込み最適化後処理器を作成"""
         try:
-            self.logger.info("Creating Sentence Embedding Optimizer")
+            logger.info("Creating Sentence Embedding Optimizer")
             
             postprocessor = SentenceEmbeddingOptimizer(
                 percentile_cutoff=percentile_cutoff,
@@ -138,7 +140,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to create Sentence Embedding Optimizer: {e}")
+            logger.error(f"Failed to create Sentence Embedding Optimizer: {e}")
             raise
     
     def create_combined_postprocessor(self, 
@@ -149,7 +151,7 @@ class NodePostProcessor:
                                     include_prev_next: bool = False) -> List[BaseNodePostprocessor]:
         """複数の後処理器を組み合わせた後処理器リストを作成"""
         try:
-            self.logger.info("Creating Combined Postprocessor")
+            logger.info("Creating Combined Postprocessor")
             
             postprocessors = []
             
@@ -180,11 +182,11 @@ class NodePostProcessor:
                 self.create_sentence_embedding_optimizer()
             )
             
-            self.logger.info(f"Combined Postprocessor created with {len(postprocessors)} processors")
+            logger.info(f"Combined Postprocessor created with {len(postprocessors)} processors")
             return postprocessors
             
         except Exception as e:
-            self.logger.error(f"Failed to create Combined Postprocessor: {e}")
+            logger.error(f"Failed to create Combined Postprocessor: {e}")
             raise
     
     def apply_postprocessors(self, 
@@ -193,7 +195,7 @@ class NodePostProcessor:
                            postprocessors: List[BaseNodePostprocessor]) -> List[NodeWithScore]:
         """複数の後処理器を順次適用"""
         try:
-            self.logger.info(f"Applying {len(postprocessors)} postprocessors to {len(nodes)} nodes")
+            logger.info(f"Applying {len(postprocessors)} postprocessors to {len(nodes)} nodes")
             
             processed_nodes = nodes
             
@@ -202,16 +204,16 @@ class NodePostProcessor:
                     processed_nodes = postprocessor.postprocess_nodes(
                         processed_nodes, query_bundle
                     )
-                    self.logger.debug(f"Postprocessor {i+1}/{len(postprocessors)}: {len(processed_nodes)} nodes remaining")
+                    logger.debug(f"Postprocessor {i+1}/{len(postprocessors)}: {len(processed_nodes)} nodes remaining")
                 except Exception as e:
-                    self.logger.warning(f"Postprocessor {i+1} failed: {e}")
+                    logger.warning(f"Postprocessor {i+1} failed: {e}")
                     continue
             
-            self.logger.info(f"Postprocessing complete: {len(processed_nodes)} nodes remaining")
+            logger.info(f"Postprocessing complete: {len(processed_nodes)} nodes remaining")
             return processed_nodes
             
         except Exception as e:
-            self.logger.error(f"Failed to apply postprocessors: {e}")
+            logger.error(f"Failed to apply postprocessors: {e}")
             raise
     
     def get_postprocessor_by_type(self, 
@@ -245,7 +247,7 @@ class NodePostProcessor:
             return postprocessor
             
         except Exception as e:
-            self.logger.error(f"Failed to get postprocessor: {e}")
+            logger.error(f"Failed to get postprocessor: {e}")
             raise
     
     def create_quality_filter_chain(self, 
@@ -254,7 +256,7 @@ class NodePostProcessor:
                                   max_text_length: int = 5000) -> List[BaseNodePostprocessor]:
         """品質フィルタリング用の後処理器チェーンを作成"""
         try:
-            self.logger.info("Creating Quality Filter Chain")
+            logger.info("Creating Quality Filter Chain")
             
             # カスタム品質フィルター
             class QualityFilter(BaseNodePostprocessor):
@@ -281,10 +283,10 @@ class NodePostProcessor:
             return postprocessors
             
         except Exception as e:
-            self.logger.error(f"Failed to create Quality Filter Chain: {e}")
+            logger.error(f"Failed to create Quality Filter Chain: {e}")
             raise
     
     def clear_cache(self):
         """後処理器のキャッシュをクリア"""
         self._postprocessors_cache.clear()
-        self.logger.info("Postprocessor cache cleared")
\ No newline at end of file
+        logger.info("Postprocessor cache cleared")
\ No newline at end of file
@@ -22,13 +22,14 @@ from services.index_service import IndexingService
 from services.retriever_service import RetrieverService
 from configs import ProcessingConfig
 
+logger = logging.getLogger(__name__)
+
 
 class QueryService:
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
         self.indexing_service = IndexingService()
         self.retriever_service = RetrieverService()
-        self.logger.info("QueryService initialized")
+        logger.info("QueryService initialized")
 
     
     def create_retriever_query_engine(self, 
@@ -37,7 +38,7 @@ class QueryService:
                                     **retriever_kwargs) -> RetrieverQueryEngine:
         """リトリーバーベースのクエリエンジンを作成"""
         try:
-            self.logger.info(f"Creating Retriever Query Engine with {retriever_type} retriever...")
+            logger.info(f"Creating Retriever Query Engine with {retriever_type} retriever...")
             
             # リトリーバーを作成
             retriever = self.retriever_service.get_retriever_by_type(
@@ -55,11 +56,11 @@ class QueryService:
                 response_synthesizer=response_synthesizer
             )
             
-            self.logger.info("Retriever Query Engine created successfully")
+            logger.info("Retriever Query Engine created successfully")
             return query_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Retriever Query Engine: {e}")
+            logger.error(f"Failed to create Retriever Query Engine: {e}")
             raise
     
     def create_knowledge_graph_query_engine(self, 
@@ -68,7 +69,7 @@ class QueryService:
                                           include_text: bool = True) -> KnowledgeGraphQueryEngine:
         """ナレッジグラフクエリエンジンを作成"""
         try:
-            self.logger.info("Creating Knowledge Graph Query Engine...")
+            logger.info("Creating Knowledge Graph Query Engine...")
             
             # KnowledgeGraphIndexを取得
             kg_index = self.indexing_service.load_index('knowledge_graph')
@@ -81,11 +82,11 @@ class QueryService:
                 include_text=include_text
             )
             
-            self.logger.info("Knowledge Graph Query Engine created successfully")
+            logger.info("Knowledge Graph Query Engine created successfully")
             return query_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Knowledge Graph Query Engine: {e}")
+            logger.error(f"Failed to create Knowledge Graph Query Engine: {e}")
             raise
     
     def create_router_query_engine(self, 
@@ -94,7 +95,7 @@ class QueryService:
                                  selector_type: str = "llm") -> RouterQueryEngine:
         """ルータークエリエンジンを作成"""
         try:
-            self.logger.info("Creating Router Query Engine...")
+            logger.info("Creating Router Query Engine...")
             
             # ツールメタデータを作成
             tools = []
@@ -122,11 +123,11 @@ class QueryService:
                 query_engine_tools=tools
             )
             
-            self.logger.info("Router Query Engine created successfully")
+            logger.info("Router Query Engine created successfully")
             return router_query_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Router Query Engine: {e}")
+            logger.error(f"Failed to create Router Query Engine: {e}")
             raise
     
     def create_multi_step_query_engine(self, 
@@ -134,7 +135,7 @@ class QueryService:
                                      num_steps: int = 3) -> MultiStepQueryEngine:
         """マルチステップクエリエンジンを作成"""
         try:
-            self.logger.info("Creating Multi-Step Query Engine...")
+            logger.info("Creating Multi-Step Query Engine...")
             
             query_engine = MultiStepQueryEngine(
                 query_engine=base_query_engine,
@@ -142,11 +143,11 @@ class QueryService:
                 num_steps=num_steps
             )
             
-            self.logger.info("Multi-Step Query Engine created successfully")
+            logger.info("Multi-Step Query Engine created successfully")
             return query_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Multi-Step Query Engine: {e}")
+            logger.error(f"Failed to create Multi-Step Query Engine: {e}")
             raise
     
     def create_retry_query_engine(self, 
@@ -154,24 +155,24 @@ class QueryService:
                                 max_retries: int = 3) -> RetryQueryEngine:
         """リトライクエリエンジンを作成"""
         try:
-            self.logger.info("Creating Retry Query Engine...")
+            logger.info("Creating Retry Query Engine...")
             
             query_engine = RetryQueryEngine(
                 query_engine=base_query_engine,
                 max_retries=max_retries
             )
             
-            self.logger.info("Retry Query Engine created successfully")
+            logger.info("Retry Query Engine created successfully")
             return query_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Retry Query Engine: {e}")
+            logger.error(f"Failed to create Retry Query Engine: {e}")
             raise
     
     def create_comprehensive_query_engine(self) -> RouterQueryEngine:
         """包括的なクエリエンジンを作成（複数のエンジンを組み合わせ）"""
         try:
-            self.logger.info("Creating Comprehensive Query Engine...")
+            logger.info("Creating Comprehensive Query Engine...")
             
             # 各タイプのクエリエンジンを作成
             vector_engine = self.create_retriever_query_engine(
@@ -213,11 +214,11 @@ class QueryService:
                 max_retries=2
             )
             
-            self.logger.info("Comprehensive Query Engine created successfully")
+            logger.info("Comprehensive Query Engine created successfully")
             return final_engine
             
         except Exception as e:
-            self.logger.error(f"Failed to create Comprehensive Query Engine: {e}")
+            logger.error(f"Failed to create Comprehensive Query Engine: {e}")
             raise
     
     def query(self, 
@@ -225,7 +226,7 @@ class QueryService:
             engine_type: str = "comprehensive") -> str:
         """クエリを実行"""
         try:
-            self.logger.info(f"Executing query: {query_text[:100]}...")
+            logger.info(f"Executing query: {query_text[:100]}...")
             
             # エンジンタイプに応じてクエリエンジンを作成
             if engine_type == "comprehensive":
@@ -244,11 +245,11 @@ class QueryService:
             # クエリを実行
             response = query_engine.query(query_text)
             
-            self.logger.info("Query executed successfully")
+            logger.info("Query executed successfully")
             return str(response)
             
         except Exception as e:
-            self.logger.error(f"Failed to execute query: {e}")
+            logger.error(f"Failed to execute query: {e}")
             raise
     
     def batch_query(self, 
@@ -256,7 +257,7 @@ class QueryService:
                    engine_type: str = "comprehensive") -> List[str]:
         """複数のクエリを一括実行"""
         try:
-            self.logger.info(f"Executing batch queries: {len(queries)} queries")
+            logger.info(f"Executing batch queries: {len(queries)} queries")
             
             results = []
             for query in queries:
@@ -264,12 +265,12 @@ class QueryService:
                     result = self.query(query, engine_type)
                     results.append(result)
                 except Exception as e:
-                    self.logger.error(f"Failed to execute query '{query[:50]}...': {e}")
+                    logger.error(f"Failed to execute query '{query[:50]}...': {e}")
                     results.append(f"Error: {str(e)}")
             
-            self.logger.info("Batch queries executed successfully")
+            logger.info("Batch queries executed successfully")
             return results
             
         except Exception as e:
-            self.logger.error(f"Failed to execute batch queries: {e}")
+            logger.error(f"Failed to execute batch queries: {e}")
             raise
\ No newline at end of file
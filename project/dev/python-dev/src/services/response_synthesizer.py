@@ -14,10 +14,11 @@ from llama_index.core.base.response.schema import Response
 from db.database_manager import db_manager
 from configs import ProcessingConfig
 
+logger = logging.getLogger(__name__)
+
+
 class ResponseSynthesizer:
     def __init__(self, templates_dir: str = None):
-        self.logger = logging.getLogger(__name__)
-        
         # テンプレートディレクトリの設定
         if templates_dir is None:
             templates_dir = Path(__file__).parent.parent / "templates" / "contexts"
@@ -48,7 +49,7 @@ class ResponseSynthesizer:
                                    response_mode: str = "default") -> str:
         """テンプレートからコンテクストを生成"""
         try:
-            self.logger.info(f"Creating context from template: {template_name}")
+            logger.info(f"Creating context from template: {template_name}")
             
             # テンプレートファイル名の準備
             template_file = f"{template_name}.md"
@@ -56,7 +57,7 @@ class ResponseSynthesizer:
             try:
                 template = self.jinja_env.get_template(template_file)
             except TemplateNotFound:
-                self.logger.warning(f"Template {template_file} not found, using default")
+                logger.warning(f"Template {template_file} not found, using default")
                 template = self.jinja_env.get_template("default.md")
             
             # テンプレート変数の準備
@@ -76,11 +77,11 @@ class ResponseSynthesizer:
             # テンプレートをレンダリング
             context = template.render(**template_vars)
             
-            self.logger.info("Context generated successfully from template")
+            logger.info("Context generated successfully from template")
             return context
             
         except Exception as e:
-            self.logger.error(f"Failed to create context from template: {e}")
+            logger.error(f"Failed to create context from template: {e}")
             # フォールバック：シンプルなコンテクスト生成
             return self._create_fallback_context(query, retrieved_nodes)
     
@@ -123,7 +124,7 @@ class ResponseSynthesizer:
                           variables: Optional[Dict[str, Any]] = None) -> str:
         """レスポンスを合成"""
         try:
-            self.logger.info(f"Synthesizing response for query: {query[:50]}...")
+            logger.info(f"Synthesizing response for query: {query[:50]}...")
             
             # テンプレートからコンテクストを生成
             context = self.create_context_from_template(
@@ -148,11 +149,11 @@ class ResponseSynthesizer:
                 nodes=retrieved_nodes
             )
             
-            self.logger.info("Response synthesized successfully")
+            logger.info("Response synthesized successfully")
             return str(response)
             
         except Exception as e:
-            self.logger.error(f"Failed to synthesize response: {e}")
+            logger.error(f"Failed to synthesize response: {e}")
             raise
     
     def synthesize_with_custom_prompt(self,
@@ -162,7 +163,7 @@ class ResponseSynthesizer:
                                     variables: Optional[Dict[str, Any]] = None) -> str:
         """カスタムプロンプトでレスポンスを合成"""
         try:
-            self.logger.info("Synthesizing response with custom prompt")
+            logger.info("Synthesizing response with custom prompt")
             
             # カスタムプロンプトをテンプレートとして処理
             template = Template(custom_prompt)
@@ -184,11 +185,11 @@ class ResponseSynthesizer:
             # LLMに直接問い合わせ
             response = Settings.llm.complete(formatted_prompt)
             
-            self.logger.info("Custom prompt response generated successfully")
+            logger.info("Custom prompt response generated successfully")
             return str(response)
             
         except Exception as e:
-            self.logger.error(f"Failed to synthesize with custom prompt: {e}")
+            logger.error(f"Failed to synthesize with custom prompt: {e}")
             raise
     
     def _create_simple_context(self, nodes: List[NodeWithScore]) -> str:
@@ -207,7 +208,7 @@ class ResponseSynthesizer:
             template_path = self.templates_dir / f"{template_name}.md"
             
             if template_path.exists() and not overwrite:
-                self.logger.warning(f"Template {template_name} already exists")
+                logger.warning(f"Template {template_name} already exists")
                 return False
             
             template_path.write_text(template_content, encoding='utf-8')
@@ -220,11 +221,11 @@ class ResponseSynthesizer:
                 lstrip_blocks=True
             )
             
-            self.logger.info(f"Template {template_name} created successfully")
+            logger.info(f"Template {template_name} created successfully")
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to create template: {e}")
+            logger.error(f"Failed to create template: {e}")
             return False
     
     def list_templates(self) -> List[str]:
@@ -236,7 +237,7 @@ class ResponseSynthesizer:
             return sorted(templates)
             
         except Exception as e:
-            self.logger.error(f"Failed to list templates: {e}")
+            logger.error(f"Failed to list templates: {e}")
             return []
     
     def get_template_content(self, template_name: str) -> Optional[str]:
@@ -248,7 +249,7 @@ class ResponseSynthesizer:
             return None
             
         except Exception as e:
-            self.logger.error(f"Failed to get template content: {e}")
+            logger.error(f"Failed to get template content: {e}")
             return None
     
     def batch_synthesize(self,
@@ -258,7 +259,7 @@ class ResponseSynthesizer:
                         variables_list: Optional[List[Dict[str, Any]]] = None) -> List[str]:
         """複数のクエリを一括でレスポンス合成"""
         try:
-            self.logger.info(f"Batch synthesizing {len(queries)} responses")
+            logger.info(f"Batch synthesizing {len(queries)} responses")
             
             responses = []
             variables_list = variables_list or [{}] * len(queries)
@@ -272,16 +273,16 @@ class ResponseSynthesizer:
                         variables=variables
                     )
                     responses.append(response)
-                    self.logger.debug(f"Synthesized response {i+1}/{len(queries)}")
+                    logger.debug(f"Synthesized response {i+1}/{len(queries)}")
                 except Exception as e:
-                    self.logger.error(f"Failed to synthesize response {i+1}: {e}")
+                    logger.error(f"Failed to synthesize response {i+1}: {e}")
                     responses.append(f"Error: {str(e)}")
             
-            self.logger.info("Batch synthesis completed")
+            logger.info("Batch synthesis completed")
             return responses
             
         except Exception as e:
-            self.logger.error(f"Failed to batch synthesize: {e}")
+            logger.error(f"Failed to batch synthesize: {e}")
             raise
     
     def synthesize_with_metadata_enrichment(self,
@@ -291,7 +292,7 @@ class ResponseSynthesizer:
                                           enrich_metadata: bool = True) -> str:
         """メタデータ拡張付きでレスポンスを合成"""
         try:
-            self.logger.info("Synthesizing response with metadata enrichment")
+            logger.info("Synthesizing response with metadata enrichment")
             
             # メタデータを拡張
             if enrich_metadata:
@@ -314,7 +315,7 @@ class ResponseSynthesizer:
             )
             
         except Exception as e:
-            self.logger.error(f"Failed to synthesize with metadata enrichment: {e}")
+            logger.error(f"Failed to synthesize with metadata enrichment: {e}")
             raise
     
     def _enrich_node_metadata(self, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
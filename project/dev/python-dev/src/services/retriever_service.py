@@ -21,11 +21,13 @@ from llama_index.core import Settings
 from db.database_manager import db_manager
 from services.index_service import IndexingService
 
+logger = logging.getLogger(__name__)
+
+
 class RetrieverService:
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
         self.indexing_service = IndexingService()
-        self.logger.info("RetrieverService initialized")
+        logger.info("RetrieverService initialized")
 
             
     def create_vector_retriever(self, 
@@ -33,13 +35,13 @@ class RetrieverService:
                               similarity_cutoff: float = 0.7) -> VectorIndexRetriever:
         """ベクトルインデックスからのリトリーバーを作成"""
         try:
-            self.logger.info("Creating Vector Retriever...")
+            logger.info("Creating Vector Retriever...")
             
             # VectorStoreIndexを取得または作成
             try:
                 vector_index = self.indexing_service.load_index('vector_store')
             except:
-                self.logger.warning("Vector index not found, creating new one...")
+                logger.warning("Vector index not found, creating new one...")
                 # インデックスが存在しない場合は空のインデックスを作成
                 from llama_index.core import VectorStoreIndex
                 storage_context = db_manager.get_storage_context()
@@ -53,24 +55,24 @@ class RetrieverService:
             # 後処理でスコアフィルタリング
             retriever = self._add_postprocessors(retriever, similarity_cutoff)
             
-            self.logger.info("Vector Retriever created successfully")
+            logger.info("Vector Retriever created successfully")
             return retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Vector Retriever: {e}")
+            logger.error(f"Failed to create Vector Retriever: {e}")
             raise
     
     def create_keyword_retriever(self, 
                                keyword_top_k: int = 5) -> KeywordTableSimpleRetriever:
         """キーワードテーブルからのリトリーバーを作成"""
         try:
-            self.logger.info("Creating Keyword Retriever...")
+            logger.info("Creating Keyword Retriever...")
             
             # KeywordTableIndexを取得または作成
             try:
                 keyword_index = self.indexing_service.load_index('keyword_table')
             except:
-                self.logger.warning("Keyword index not found, creating new one...")
+                logger.warning("Keyword index not found, creating new one...")
                 from llama_index.core import KeywordTableIndex
                 storage_context = db_manager.get_storage_context()
                 keyword_index = KeywordTableIndex([], storage_context=storage_context)
@@ -80,33 +82,33 @@ class RetrieverService:
                 top_k=keyword_top_k
             )
             
-            self.logger.info("Keyword Retriever created successfully")
+            logger.info("Keyword Retriever created successfully")
             return retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Keyword Retriever: {e}")
+            logger.error(f"Failed to create Keyword Retriever: {e}")
             raise
     
     def create_summary_retriever(self) -> SummaryIndexRetriever:
         """サマリーインデックスからのリトリーバーを作成"""
         try:
-            self.logger.info("Creating Summary Retriever...")
+            logger.info("Creating Summary Retriever...")
             
             try:
                 summary_index = self.indexing_service.load_index('summary')
             except:
-                self.logger.warning("Summary index not found, creating new one...")
+                logger.warning("Summary index not found, creating new one...")
                 from llama_index.core import SummaryIndex
                 storage_context = db_manager.get_storage_context()
                 summary_index = SummaryIndex([], storage_context=storage_context)
             
             retriever = SummaryIndexRetriever(index=summary_index)
             
-            self.logger.info("Summary Retriever created successfully")
+            logger.info("Summary Retriever created successfully")
             return retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Summary Retriever: {e}")
+            logger.error(f"Failed to create Summary Retriever: {e}")
             raise
     
     def create_knowledge_graph_retriever(self, 
@@ -114,12 +116,12 @@ class RetrieverService:
                                        include_text: bool = True) -> KnowledgeGraphRAGRetriever:
         """ナレッジグラフからのリトリーバーを作成"""
         try:
-            self.logger.info("Creating Knowledge Graph Retriever...")
+            logger.info("Creating Knowledge Graph Retriever...")
             
             try:
                 kg_index = self.indexing_service.load_index('knowledge_graph')
             except:
-                self.logger.warning("Knowledge Graph index not found, creating new one...")
+                logger.warning("Knowledge Graph index not found, creating new one...")
                 from llama_index.core import KnowledgeGraphIndex
                 storage_context = db_manager.get_storage_context()
                 kg_index = KnowledgeGraphIndex([], storage_context=storage_context)
@@ -130,11 +132,11 @@ class RetrieverService:
                 include_text=include_text
             )
             
-            self.logger.info("Knowledge Graph Retriever created successfully")
+            logger.info("Knowledge Graph Retriever created successfully")
             return retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Knowledge Graph Retriever: {e}")
+            logger.error(f"Failed to create Knowledge Graph Retriever: {e}")
             raise
     
     def create_fusion_retriever(self, 
@@ -143,7 +145,7 @@ class RetrieverService:
                               num_queries: int = 4) -> QueryFusionRetriever:
         """複数のリトリーバーを融合したリトリーバーを作成"""
         try:
-            self.logger.info("Creating Fusion Retriever...")
+            logger.info("Creating Fusion Retriever...")
             
             fusion_retriever = QueryFusionRetriever(
                 retrievers=retrievers,
@@ -153,11 +155,11 @@ class RetrieverService:
                 use_async=True
             )
             
-            self.logger.info("Fusion Retriever created successfully")
+            logger.info("Fusion Retriever created successfully")
             return fusion_retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Fusion Retriever: {e}")
+            logger.error(f"Failed to create Fusion Retriever: {e}")
             raise
     
     def create_hybrid_retriever(self, 
@@ -166,7 +168,7 @@ class RetrieverService:
                               similarity_cutoff: float = 0.7) -> QueryFusionRetriever:
         """ベクトル検索とキーワード検索を組み合わせたハイブリッドリトリーバー"""
         try:
-            self.logger.info("Creating Hybrid Retriever...")
+            logger.info("Creating Hybrid Retriever...")
             
             # ベクトルリトリーバー
             vector_retriever = self.create_vector_retriever(
@@ -185,11 +187,11 @@ class RetrieverService:
                 similarity_top_k=max(similarity_top_k, keyword_top_k)
             )
             
-            self.logger.info("Hybrid Retriever created successfully")
+            logger.info("Hybrid Retriever created successfully")
             return hybrid_retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to create Hybrid Retriever: {e}")
+            logger.error(f"Failed to create Hybrid Retriever: {e}")
             raise
     
     def _add_postprocessors(self, retriever, similarity_cutoff: float = 0.7):
@@ -206,7 +208,7 @@ class RetrieverService:
             return retriever
             
         except Exception as e:
-            self.logger.error(f"Failed to add postprocessors: {e}")
+            logger.error(f"Failed to add postprocessors: {e}")
             return retriever
     
     def get_retriever_by_type(self, 
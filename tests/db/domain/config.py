@@ -14,6 +14,10 @@ class DatabaseConfig:
     port: int = 1433
     driver: str = "ODBC Driver 17 for SQL Server"
     trusted_connection: bool = False
+    pool_size: int = 25
+    max_overflow: int = 50
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
 
 
 class ConfigManager:
@@ -36,7 +40,11 @@ class ConfigManager:
                 password=os.getenv(f"{prefix}PASSWORD", ""),
                 port=int(os.getenv(f"{prefix}PORT", "1433")),
                 driver=os.getenv(f"{prefix}DRIVER", "ODBC Driver 17 for SQL Server"),
-                trusted_connection=os.getenv(f"{prefix}TRUSTED_CONNECTION", "false").lower() == "true"
+                trusted_connection=os.getenv(f"{prefix}TRUSTED_CONNECTION", "false").lower() == "true",
+                pool_size=int(os.getenv(f"{prefix}POOL_SIZE", "25")),
+                max_overflow=int(os.getenv(f"{prefix}MAX_OVERFLOW", "50")),
+                pool_timeout=int(os.getenv(f"{prefix}POOL_TIMEOUT", "30")),
+                pool_recycle=int(os.getenv(f"{prefix}POOL_RECYCLE", "1800"))
             )
             
             self._configs[server] = config
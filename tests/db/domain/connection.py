@@ -1,65 +1,176 @@
-from typing import Dict, Optional
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import sessionmaker, Session
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from weakref import WeakSet
+from sqlalchemy import create_engine, event, inspect, Engine, URL
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from .config import ConfigManager, DatabaseConfig
 from .enums import DatabaseServer
+from .models import Base
+
+
+# リクエスト単位のセッションスコープ（request_scope 内でのみ設定される）
+_request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
 
 
 class DatabaseManager:
     """データベース接続管理クラス"""
     
+    # スキーマ作成済みのエンジン（同一エンジンへの重複チェックを省略）
+    _initialized_engines: "WeakSet[Engine]" = WeakSet()
+    _schema_lock = threading.Lock()
+    
     def __init__(self, config_manager: ConfigManager):
         self._config_manager = config_manager
         self._engines: Dict[DatabaseServer, Engine] = {}
-        self._session_makers: Dict[DatabaseServer, sessionmaker] = {}
+        self._engine_cache: Dict[Tuple[URL, int, int, int, int], Engine] = {}
+        self._session_maker_map: Optional[Dict[DatabaseServer, sessionmaker]] = None
+        self._scoped_sessions: Dict[DatabaseServer, scoped_session] = {}
     
-    def _create_connection_string(self, config: DatabaseConfig) -> str:
-        """接続文字列を作成"""
+    @property
+    def _session_makers(self) -> Dict[DatabaseServer, sessionmaker]:
+        """セッションメーカー辞書（初回アクセス時に作成）"""
+        if self._session_maker_map is None:
+            self._session_maker_map = {}
+        return self._session_maker_map
+    
+    def _create_connection_string(self, config: DatabaseConfig) -> URL:
+        """接続 URL を作成（認証情報は URL 側でエスケープされる）"""
         if config.trusted_connection:
-            return (
-                f"mssql+pymssql://@{config.server}:{config.port}/"
-                f"{config.database}?trusted_connection=yes"
+            return URL.create(
+                "mssql+pymssql",
+                host=config.server,
+                port=config.port,
+                database=config.database,
+                query={"trusted_connection": "yes"}
             )
         else:
-            return (
-                f"mssql+pymssql://{config.username}:{config.password}@"
-                f"{config.server}:{config.port}/{config.database}"
+            return URL.create(
+                "mssql+pymssql",
+                username=config.username,
+                password=config.password,
+                host=config.server,
+                port=config.port,
+                database=config.database
             )
     
     def get_engine(self, server: DatabaseServer) -> Engine:
         """指定されたサーバーのエンジンを取得"""
-        if server not in self._engines:
+        engine = self._engines.get(server)
+        if engine is None:
             config = self._config_manager.get_config(server)
             connection_string = self._create_connection_string(config)
             
-            self._engines[server] = create_engine(
+            # 同一接続文字列・同一プール設定のサーバー間でエンジン（接続プール）を共有
+            # （共有はこのマネージャー内に限定し、close_all で自身のエンジンのみ破棄する）
+            cache_key = (
                 connection_string,
-                poolclass=QueuePool,
-                pool_size=10,
-                max_overflow=20,
-                pool_pre_ping=True,
-                echo=False
+                config.pool_size,
+                config.max_overflow,
+                config.pool_timeout,
+                config.pool_recycle
             )
+            engine = self._engine_cache.get(cache_key)
+            if engine is None:
+                engine = self._engine_cache[cache_key] = create_engine(
+                    connection_string,
+                    poolclass=QueuePool,
+                    pool_size=config.pool_size,
+                    max_overflow=config.max_overflow,
+                    pool_timeout=config.pool_timeout,
+                    pool_recycle=config.pool_recycle,
+                    pool_pre_ping=True,
+                    echo=False
+                )
+            
+            self._engines[server] = engine
         
-        return self._engines[server]
+        return engine
     
     def get_session_maker(self, server: DatabaseServer) -> sessionmaker:
         """指定されたサーバーのセッションメーカーを取得"""
-        if server not in self._session_makers:
+        session_maker = self._session_makers.get(server)
+        if session_maker is None:
             engine = self.get_engine(server)
-            self._session_makers[server] = sessionmaker(bind=engine)
+            session_maker = self._session_makers[server] = sessionmaker(bind=engine)
         
-        return self._session_makers[server]
+        return session_maker
+    
+    def create_tables(self, server: DatabaseServer) -> None:
+        """テーブルを作成（既に全テーブルが存在する場合は何もしない）
+
+        DDL を実行しうるため、リクエスト処理中ではなく起動時に明示的に呼び出す
+        """
+        engine = self.get_engine(server)
+        with self._schema_lock:
+            if engine in self._initialized_engines:
+                return
+            
+            # テーブル一覧を 1 回だけ取得し、不足がある場合のみ create_all を実行
+            existing_tables = set(inspect(engine).get_table_names())
+            if not set(Base.metadata.tables).issubset(existing_tables):
+                Base.metadata.create_all(engine, checkfirst=True)
+            
+            self._initialized_engines.add(engine)
     
     def get_session(self, server: DatabaseServer) -> Session:
-        """指定されたサーバーのセッションを取得"""
+        """指定されたサーバーのセッションを取得（request_scope 内では同一セッションを返す）"""
+        if self.in_request_scope():
+            return self._get_scoped_session(server)()
         session_maker = self.get_session_maker(server)
         return session_maker()
     
+    def _get_scoped_session(self, server: DatabaseServer) -> scoped_session:
+        """リクエストスコープごとのセッションレジストリを取得"""
+        registry = self._scoped_sessions.get(server)
+        if registry is None:
+            registry = self._scoped_sessions[server] = scoped_session(
+                self.get_session_maker(server),
+                scopefunc=_request_scope.get
+            )
+        return registry
+    
+    @staticmethod
+    def in_request_scope() -> bool:
+        """リクエストスコープ内かどうか"""
+        return _request_scope.get() is not None
+    
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """スコープ内のリポジトリ操作で同じセッション（アイデンティティマップ）を共有"""
+        token = _request_scope.set(object())
+        try:
+            yield
+        finally:
+            for registry in self._scoped_sessions.values():
+                registry.remove()
+            _request_scope.reset(token)
+    
     def close_all(self) -> None:
         """全ての接続を閉じる"""
-        for engine in self._engines.values():
+        for registry in self._scoped_sessions.values():
+            registry.remove()
+        self._scoped_sessions.clear()
+        for engine in self._engine_cache.values():
             engine.dispose()
+        self._engine_cache.clear()
         self._engines.clear()
-        self._session_makers.clear()
+        self._session_maker_map = None
+
+
+@contextmanager
+def count_queries(session: Session) -> Iterator[List[str]]:
+    """ブロック内で発行された SQL 文を収集（N+1 の検出用）"""
+    statements: List[str] = []
+    engine = session.get_bind()
+    
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
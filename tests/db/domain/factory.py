@@ -1,5 +1,7 @@
+from functools import cached_property
 from .config import ConfigManager
 from .connection import DatabaseManager
+from .enums import DatabaseServer
 from .unit_of_work import UnitOfWorkFactory
 from .service import UserService, ProductService
 
@@ -24,12 +26,27 @@ class DomainFactory:
     def uow_factory(self) -> UnitOfWorkFactory:
         return self._uow_factory
     
-    def create_user_service(self) -> UserService:
+    @cached_property
+    def user_service(self) -> UserService:
         return UserService(self._uow_factory)
     
-    def create_product_service(self) -> ProductService:
+    @cached_property
+    def product_service(self) -> ProductService:
         return ProductService(self._uow_factory)
     
+    def create_user_service(self) -> UserService:
+        return self.user_service
+    
+    def create_product_service(self) -> ProductService:
+        return self.product_service
+    
+    def initialize_schema(self, *servers: DatabaseServer) -> None:
+        """指定サーバーのテーブルを作成（起動時に明示的に呼び出す）"""
+        for server in servers:
+            self._db_manager.create_tables(server)
+    
     def cleanup(self) -> None:
         """リソースをクリーンアップ"""
         self._db_manager.close_all()
+        self.__dict__.pop('user_service', None)
+        self.__dict__.pop('product_service', None)
@@ -25,6 +25,8 @@ class User(Base):
     __tablename__ = 'users'
     
     # 追加フィールドをここに定義
+    # 一覧取得で頻繁に参照するリレーションは lazy="selectin" を指定して N+1 を回避
+    # 例: roles = relationship("Role", lazy="selectin")
     pass
 
 
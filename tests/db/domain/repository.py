@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List, Optional, Any
+from typing import Generic, TypeVar, List, Optional, Any, Dict, Tuple
+from sqlalchemy import select, bindparam, update, delete, inspect, literal, Select
 from sqlalchemy.orm import Session
 from .models import Base
 
@@ -14,7 +15,7 @@ class IRepository(ABC, Generic[T]):
         pass
     
     @abstractmethod
-    def get_all(self) -> List[T]:
+    def get_all(self, *load_options: Any) -> List[T]:
         pass
     
     @abstractmethod
@@ -33,37 +34,104 @@ class IRepository(ABC, Generic[T]):
 class BaseRepository(IRepository[T]):
     """ベースリポジトリクラス"""
     
+    # (モデルクラス, 条件キー) ごとに構築済みの SELECT 文をキャッシュ
+    _stmt_cache: Dict[Tuple[type, Tuple[Tuple[str, str], ...]], Select] = {}
+    
     def __init__(self, session: Session, model_class: type[T]):
         self._session = session
         self._model_class = model_class
     
     def get_by_id(self, id: int) -> Optional[T]:
-        return self._session.query(self._model_class).filter(
-            self._model_class.id == id
-        ).first()
+        # 主キー検索はアイデンティティマップを優先して参照
+        return self._session.get(self._model_class, id)
+    
+    def _get_select(self, keys: Tuple[Tuple[str, str], ...] = ()) -> Select:
+        """条件キーに対応する SELECT 文を取得（値は bindparam で後から渡す）
+
+        keys は (カラム名, 種別) のタプル。種別は "scalar"（等価）・"list"（IN）・"null"（IS NULL）
+        """
+        cache_key = (self._model_class, keys)
+        stmt = self._stmt_cache.get(cache_key)
+        if stmt is None:
+            stmt = select(self._model_class)
+            for key, kind in keys:
+                column = getattr(self._model_class, key)
+                if kind == "list":
+                    stmt = stmt.where(column.in_(bindparam(key, expanding=True)))
+                elif kind == "null":
+                    stmt = stmt.where(column.is_(None))
+                else:
+                    stmt = stmt.where(column == bindparam(key))
+            self._stmt_cache[cache_key] = stmt
+        return stmt
     
-    def get_all(self) -> List[T]:
-        return self._session.query(self._model_class).all()
+    def get_all(self, *load_options: Any) -> List[T]:
+        """全件取得（selectinload 等のローダーオプションで N+1 を回避）"""
+        stmt = self._get_select()
+        if load_options:
+            stmt = stmt.options(*load_options)
+        return self._session.scalars(stmt).all()
     
     def add(self, entity: T) -> T:
         self._session.add(entity)
         return entity
     
+    def add_many(self, entities: List[T]) -> List[T]:
+        """複数エンティティを一括 INSERT（主キーは取得しない）"""
+        self._session.bulk_save_objects(entities, return_defaults=False)
+        return entities
+    
     def update(self, entity: T) -> T:
         self._session.merge(entity)
         return entity
     
+    def update_direct(self, entity: T) -> T:
+        """UPDATE 文を直接発行して更新（merge による事前 SELECT を行わない）"""
+        values = {
+            column.key: getattr(entity, column.key)
+            for column in inspect(self._model_class).columns
+            if not column.primary_key and column.onupdate is None
+        }
+        stmt = (
+            update(self._model_class)
+            .where(self._model_class.id == entity.id)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        self._session.execute(stmt)
+        return entity
+    
+    def exists(self, id: int) -> bool:
+        """SELECT 1 で存在確認（行の取得・ORM オブジェクト化を行わない）"""
+        stmt = select(literal(1)).where(self._model_class.id == id).limit(1)
+        return self._session.execute(stmt).scalar() is not None
+    
     def delete(self, id: int) -> bool:
-        entity = self.get_by_id(id)
-        if entity:
-            self._session.delete(entity)
-            return True
-        return False
-    
-    def find_by(self, **kwargs) -> List[T]:
-        """条件検索"""
-        query = self._session.query(self._model_class)
+        """DELETE 文を直接発行して削除（事前 SELECT を行わない）"""
+        result = self._session.execute(
+            delete(self._model_class).where(self._model_class.id == id)
+        )
+        return result.rowcount > 0
+    
+    def find_by(self, *, _limit: Optional[int] = None, **kwargs) -> List[T]:
+        """条件検索（リスト・タプル・セットの値は IN 検索、None は IS NULL として 1 クエリにまとめる）
+
+        件数上限は _limit で指定する（limit という名前のカラムを条件に使えるようにするため）
+        """
+        params = {}
+        keys = []
         for key, value in kwargs.items():
-            if hasattr(self._model_class, key):
-                query = query.filter(getattr(self._model_class, key) == value)
-        return query.all()
+            if not hasattr(self._model_class, key):
+                continue
+            if value is None:
+                keys.append((key, "null"))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                params[key] = list(value)
+                keys.append((key, "list"))
+            else:
+                params[key] = value
+                keys.append((key, "scalar"))
+        stmt = self._get_select(tuple(sorted(keys)))
+        if _limit is not None:
+            stmt = stmt.limit(_limit)
+        return self._session.scalars(stmt, params).all()
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence
 from .unit_of_work import UnitOfWorkFactory
 from .models import User, Product
 from .enums import DatabaseServer
@@ -16,13 +16,13 @@ class UserService(DomainService):
     
     def get_user_by_id(self, user_id: int, server: DatabaseServer = DatabaseServer.PRIMARY) -> Optional[User]:
         """ユーザーをIDで取得"""
-        with self._uow_factory.create(server) as uow:
+        with self._uow_factory.create(server, readonly=True) as uow:
             return uow.users.get_by_id(user_id)
     
-    def get_all_users(self, server: DatabaseServer = DatabaseServer.PRIMARY) -> List[User]:
-        """全ユーザーを取得"""
-        with self._uow_factory.create(server) as uow:
-            return uow.users.get_all()
+    def get_all_users(self, server: DatabaseServer = DatabaseServer.PRIMARY, load_options: Sequence[Any] = ()) -> List[User]:
+        """全ユーザーを取得（load_options に selectinload(User.xxx) 等を指定可能）"""
+        with self._uow_factory.create(server, readonly=True) as uow:
+            return uow.users.get_all(*load_options)
     
     def create_user(self, user: User, server: DatabaseServer = DatabaseServer.PRIMARY) -> User:
         """ユーザーを作成"""
@@ -30,6 +30,13 @@ class UserService(DomainService):
             created_user = uow.users.add(user)
             uow.commit()
             return created_user
+    
+    def create_users(self, users: List[User], server: DatabaseServer = DatabaseServer.PRIMARY) -> List[User]:
+        """ユーザーを一括作成"""
+        with self._uow_factory.create(server) as uow:
+            created_users = uow.users.add_many(users)
+            uow.commit()
+            return created_users
 
 
 class ProductService(DomainService):
@@ -37,10 +44,10 @@ class ProductService(DomainService):
     
     def get_product_by_id(self, product_id: int, server: DatabaseServer = DatabaseServer.PRIMARY) -> Optional[Product]:
         """商品をIDで取得"""
-        with self._uow_factory.create(server) as uow:
+        with self._uow_factory.create(server, readonly=True) as uow:
             return uow.products.get_by_id(product_id)
     
-    def get_all_products(self, server: DatabaseServer = DatabaseServer.PRIMARY) -> List[Product]:
-        """全商品を取得"""
-        with self._uow_factory.create(server) as uow:
-            return uow.products.get_all()
+    def get_all_products(self, server: DatabaseServer = DatabaseServer.PRIMARY, load_options: Sequence[Any] = ()) -> List[Product]:
+        """全商品を取得（load_options に selectinload(Product.xxx) 等を指定可能）"""
+        with self._uow_factory.create(server, readonly=True) as uow:
+            return uow.products.get_all(*load_options)
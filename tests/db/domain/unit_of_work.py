@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Type
+from contextvars import ContextVar, Token
+from functools import cached_property
+from typing import Any, Dict, Optional, Type, Union
 from sqlalchemy.orm import Session
 from .repository import BaseRepository, IRepository
 from .models import Base, User, Product
@@ -30,19 +32,36 @@ class IUnitOfWork(ABC):
 class UnitOfWork(IUnitOfWork):
     """ユニットオブワーク実装"""
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, readonly: bool = False, scope_key: Any = None, owns_session: bool = True):
         self._session = session
-        self._repositories: Dict[Type, IRepository] = {}
-        
-        # リポジトリの初期化
-        self.users = self._get_repository(User)
-        self.products = self._get_repository(Product)
+        self._readonly = readonly
+        self._owns_session = owns_session
+        self._scope_key = scope_key
+        self._token: Optional[Token] = None
+        self._repository_map: Optional[Dict[Type, IRepository]] = None
+    
+    @property
+    def _repositories(self) -> Dict[Type, IRepository]:
+        """リポジトリ辞書（初回アクセス時に作成）"""
+        if self._repository_map is None:
+            self._repository_map = {}
+        return self._repository_map
+    
+    @cached_property
+    def users(self) -> BaseRepository:
+        return self._get_repository(User)
+    
+    @cached_property
+    def products(self) -> BaseRepository:
+        return self._get_repository(Product)
     
     def _get_repository(self, model_class: Type[Base]) -> BaseRepository:
         """リポジトリを取得または作成"""
-        if model_class not in self._repositories:
-            self._repositories[model_class] = BaseRepository(self._session, model_class)
-        return self._repositories[model_class]
+        repositories = self._repositories
+        repository = repositories.get(model_class)
+        if repository is None:
+            repository = repositories[model_class] = BaseRepository(self._session, model_class)
+        return repository
     
     def commit(self) -> None:
         """変更をコミット"""
@@ -56,15 +75,55 @@ class UnitOfWork(IUnitOfWork):
         """変更をロールバック"""
         self._session.rollback()
     
+    def __enter__(self):
+        self._token = _current_uow.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is not None:
+                self.rollback()
+            elif not self._readonly:
+                self.commit()
+        finally:
+            # リクエストスコープのセッションはスコープ終了時に閉じる
+            if self._owns_session:
+                self._session.close()
+            if self._token is not None:
+                _current_uow.reset(self._token)
+                self._token = None
+
+
+class NestedUnitOfWork(IUnitOfWork):
+    """外側のユニットオブワークを再利用（コミットとクローズは外側のスコープで行う）"""
+    
+    def __init__(self, outer: UnitOfWork):
+        self._outer = outer
+    
+    @property
+    def users(self) -> BaseRepository:
+        return self._outer.users
+    
+    @property
+    def products(self) -> BaseRepository:
+        return self._outer.products
+    
+    def commit(self) -> None:
+        """フラッシュのみ行い、コミットは外側に任せる"""
+        self._outer._session.flush()
+    
+    def rollback(self) -> None:
+        self._outer.rollback()
+    
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            self.rollback()
-        else:
-            self.commit()
-        self._session.close()
+        pass
+
+
+# 現在のコンテキスト（スレッド / タスク）で実行中のユニットオブワーク
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar("current_uow", default=None)
 
 
 class UnitOfWorkFactory:
@@ -73,7 +132,21 @@ class UnitOfWorkFactory:
     def __init__(self, db_manager: DatabaseManager):
         self._db_manager = db_manager
     
-    def create(self, server: DatabaseServer) -> UnitOfWork:
-        """指定されたサーバーのユニットオブワークを作成"""
+    def create(self, server: DatabaseServer, readonly: bool = False) -> Union[UnitOfWork, NestedUnitOfWork]:
+        """指定されたサーバーのユニットオブワークを作成（readonly=True の場合はコミットしない）
+
+        同じコンテキストで同じサーバーのユニットオブワークが実行中であれば、
+        新しいセッションを作らずにそれを再利用する
+        """
+        scope_key = (id(self), server)
+        current = _current_uow.get()
+        if current is not None and current._scope_key == scope_key and (readonly or not current._readonly):
+            return NestedUnitOfWork(current)
+        
         session = self._db_manager.get_session(server)
-        return UnitOfWork(session)
+        return UnitOfWork(
+            session,
+            readonly=readonly,
+            scope_key=scope_key,
+            owns_session=not self._db_manager.in_request_scope()
+        )
@@ -1,20 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Mapping, Optional, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, TextClause
+
+@lru_cache(maxsize=256)
+def _text(sql: str) -> TextClause:
+    """Build the TextClause for a SQL string once and reuse it"""
+    return text(sql)
 
 class BaseRepository(ABC):
     """Base repository class for SQL management"""
     
+    BATCH_SIZE = 1000
+    
     def __init__(self, session: Session):
         self.session = session
     
-    def execute_query(self, sql: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Execute SELECT query and return results as list of dictionaries"""
+    def execute_query(self, sql: Union[str, TextClause], params: Dict[str, Any] = None) -> List[Mapping[str, Any]]:
+        """Execute SELECT query and return results as list of read-only row mappings"""
         try:
-            result = self.session.execute(text(sql), params or {})
-            columns = result.keys()
-            return [dict(zip(columns, row)) for row in result.fetchall()]
+            statement = sql if isinstance(sql, TextClause) else _text(sql)
+            return self.session.execute(statement, params or {}).mappings().all()
         except Exception as e:
             self.session.rollback()
             raise e
@@ -22,7 +29,10 @@ class BaseRepository(ABC):
     def execute_scalar(self, sql: str, params: Dict[str, Any] = None) -> Any:
         """Execute query and return single scalar value"""
         try:
-            result = self.session.execute(text(sql), params or {})
+            if not params:
+                # No bind parameters: hand the SQL straight to the driver
+                return self.session.connection().exec_driver_sql(sql).scalar()
+            result = self.session.execute(_text(sql), params)
             return result.scalar()
         except Exception as e:
             self.session.rollback()
@@ -31,7 +41,7 @@ class BaseRepository(ABC):
     def execute_non_query(self, sql: str, params: Dict[str, Any] = None) -> int:
         """Execute INSERT/UPDATE/DELETE query and return affected rows"""
         try:
-            result = self.session.execute(text(sql), params or {})
+            result = self.session.execute(_text(sql), params or {})
             self.session.commit()
             return result.rowcount
         except Exception as e:
@@ -39,11 +49,12 @@ class BaseRepository(ABC):
             raise e
     
     def execute_batch(self, sql: str, params_list: List[Dict[str, Any]]) -> int:
-        """Execute batch operation"""
+        """Execute batch operation via executemany, in chunks of BATCH_SIZE"""
         try:
             total_affected = 0
-            for params in params_list:
-                result = self.session.execute(text(sql), params)
+            statement = _text(sql)
+            for start in range(0, len(params_list), self.BATCH_SIZE):
+                result = self.session.execute(statement, params_list[start:start + self.BATCH_SIZE])
                 total_affected += result.rowcount
             self.session.commit()
             return total_affected
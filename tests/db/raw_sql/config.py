@@ -1,10 +1,12 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import quote_plus
 from typing import Dict
 from dotenv import load_dotenv
 from .sql_server_type import SqlServerType
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatabaseConfig:
     """Database connection configuration"""
     server: str
@@ -14,7 +16,15 @@ class DatabaseConfig:
     
     def get_connection_string(self) -> str:
         """Generate SQLAlchemy connection string for pymssql"""
-        return f"mssql+pymssql://{self.user}:{self.password}@{self.server}:{self.port}"
+        return _build_connection_string(self)
+
+@lru_cache(maxsize=32)
+def _build_connection_string(config: DatabaseConfig) -> str:
+    """Build (and URL-encode credentials) once per frozen config"""
+    return (
+        f"mssql+pymssql://{quote_plus(config.user or '')}:{quote_plus(config.password or '')}"
+        f"@{config.server}:{config.port}"
+    )
 
 class Config:
     """Application configuration class"""
@@ -15,13 +15,18 @@ class ConnectionManager:
     
     def _init_engines(self):
         """Initialize engines for all configured SQL Servers"""
+        # Servers sharing a connection string share one engine owned by this manager
+        engines_by_conn_str: Dict[str, Engine] = {}
         for server_type, db_config in self.config.databases.items():
             if db_config.server:  # Only create engine if server is configured
-                engine = create_engine(
-                    db_config.get_connection_string(),
-                    pool_pre_ping=True,
-                    pool_recycle=3600
-                )
+                conn_str = db_config.get_connection_string()
+                engine = engines_by_conn_str.get(conn_str)
+                if engine is None:
+                    engine = engines_by_conn_str[conn_str] = create_engine(
+                        conn_str,
+                        pool_pre_ping=True,
+                        pool_recycle=3600
+                    )
                 self._engines[server_type] = engine
                 self._session_makers[server_type] = sessionmaker(bind=engine)
     
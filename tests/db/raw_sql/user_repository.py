@@ -1,46 +1,97 @@
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from sqlalchemy import bindparam, text, TextClause
 from .base_repository import BaseRepository
 
-class UserRepository(BaseRepository):
-    """Repository for user-related SQL operations"""
-    
-    def get_user_by_id(self, database_name: str, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get user by ID"""
-        sql = f"""
+_GET_USER_BY_ID_SQL = """
         SELECT user_id, username, email, created_at
         FROM {database_name}.dbo.users
         WHERE user_id = :user_id
         """
-        results = self.execute_query(sql, {"user_id": user_id})
-        return results[0] if results else None
-    
-    def get_all_users(self, database_name: str) -> List[Dict[str, Any]]:
-        """Get all users"""
-        sql = f"""
+
+_GET_USERS_BY_IDS_SQL = """
+        SELECT user_id, username, email, created_at
+        FROM {database_name}.dbo.users
+        WHERE user_id IN :user_ids
+        """
+
+_GET_ALL_USERS_SQL = """
         SELECT user_id, username, email, created_at
         FROM {database_name}.dbo.users
         ORDER BY created_at DESC
         """
+
+_CREATE_USER_SQL = """
+        INSERT INTO {database_name}.dbo.users (username, email, created_at)
+        VALUES (:username, :email, GETDATE())
+        """
+
+_UPDATE_USER_EMAIL_SQL = """
+        UPDATE {database_name}.dbo.users
+        SET email = :email, updated_at = GETDATE()
+        WHERE user_id = :user_id
+        """
+
+_DELETE_USER_SQL = """
+        DELETE FROM {database_name}.dbo.users
+        WHERE user_id = :user_id
+        """
+
+@lru_cache(maxsize=64)
+def _sql(template: str, database_name: str) -> str:
+    """Format a SQL template for a database once and reuse the same string object"""
+    return template.format(database_name=database_name)
+
+@lru_cache(maxsize=64)
+def _users_by_ids_statement(database_name: str) -> TextClause:
+    """Build the IN (...) lookup with an expanding bind parameter"""
+    return text(_sql(_GET_USERS_BY_IDS_SQL, database_name)).bindparams(
+        bindparam("user_ids", expanding=True)
+    )
+
+class UserRepository(BaseRepository):
+    """Repository for user-related SQL operations"""
+    
+    def get_user_by_id(self, database_name: str, user_id: int) -> Optional[Mapping[str, Any]]:
+        """Get user by ID"""
+        sql = _sql(_GET_USER_BY_ID_SQL, database_name)
+        results = self.execute_query(sql, {"user_id": user_id})
+        return results[0] if results else None
+    
+    def get_users_by_ids(self, database_name: str, user_ids: List[int]) -> Dict[int, Mapping[str, Any]]:
+        """Get several users in one query, keyed by user_id"""
+        if not user_ids:
+            return {}
+        results = self.execute_query(
+            _users_by_ids_statement(database_name),
+            {"user_ids": list(user_ids)}
+        )
+        return {row["user_id"]: row for row in results}
+    
+    def get_all_users(self, database_name: str) -> List[Mapping[str, Any]]:
+        """Get all users"""
+        sql = _sql(_GET_ALL_USERS_SQL, database_name)
         return self.execute_query(sql)
     
     def create_user(self, database_name: str, username: str, email: str) -> int:
         """Create new user and return affected rows"""
-        sql = f"""
-        INSERT INTO {database_name}.dbo.users (username, email, created_at)
-        VALUES (:username, :email, GETDATE())
-        """
+        sql = _sql(_CREATE_USER_SQL, database_name)
         return self.execute_non_query(sql, {
             "username": username,
             "email": email
         })
     
+    def create_users(self, database_name: str, users: List[Tuple[str, str]]) -> int:
+        """Create multiple users with a single executemany and return affected rows"""
+        sql = _sql(_CREATE_USER_SQL, database_name)
+        return self.execute_batch(sql, [
+            {"username": username, "email": email}
+            for username, email in users
+        ])
+    
     def update_user_email(self, database_name: str, user_id: int, email: str) -> int:
         """Update user email"""
-        sql = f"""
-        UPDATE {database_name}.dbo.users
-        SET email = :email, updated_at = GETDATE()
-        WHERE user_id = :user_id
-        """
+        sql = _sql(_UPDATE_USER_EMAIL_SQL, database_name)
         return self.execute_non_query(sql, {
             "user_id": user_id,
             "email": email
@@ -48,8 +99,5 @@ class UserRepository(BaseRepository):
     
     def delete_user(self, database_name: str, user_id: int) -> int:
         """Delete user"""
-        sql = f"""
-        DELETE FROM {database_name}.dbo.users
-        WHERE user_id = :user_id
-        """
+        sql = _sql(_DELETE_USER_SQL, database_name)
         return self.execute_non_query(sql, {"user_id": user_id})
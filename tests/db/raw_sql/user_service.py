@@ -1,16 +1,29 @@
-from typing import List, Dict, Any, Optional
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from .base_service import BaseService
 from .user_repository import UserRepository
 
 class UserService(BaseService):
     """Service for user-related business logic"""
     
-    def get_user_by_id(self, database_name: str, user_id: int) -> Optional[Dict[str, Any]]:
+    # SQL Server allows at most 2100 parameters per statement
+    MAX_IDS_PER_QUERY = 1000
+    
+    def get_user_by_id(self, database_name: str, user_id: int) -> Optional[Mapping[str, Any]]:
         """Get user by ID with business logic"""
         with self.get_repository(UserRepository) as repo:
             return repo.get_user_by_id(database_name, user_id)
     
-    def get_all_users(self, database_name: str) -> List[Dict[str, Any]]:
+    def get_users_by_ids(self, database_name: str, user_ids: List[int]) -> Dict[int, Mapping[str, Any]]:
+        """Get several users by ID, querying in chunks of MAX_IDS_PER_QUERY"""
+        unique_ids = list(dict.fromkeys(user_ids))
+        users: Dict[int, Mapping[str, Any]] = {}
+        with self.get_repository(UserRepository) as repo:
+            for start in range(0, len(unique_ids), self.MAX_IDS_PER_QUERY):
+                chunk = unique_ids[start:start + self.MAX_IDS_PER_QUERY]
+                users.update(repo.get_users_by_ids(database_name, chunk))
+        return users
+    
+    def get_all_users(self, database_name: str) -> List[Mapping[str, Any]]:
         """Get all users"""
         with self.get_repository(UserRepository) as repo:
             return repo.get_all_users(database_name)
@@ -24,6 +37,15 @@ class UserService(BaseService):
             affected_rows = repo.create_user(database_name, username, email)
             return affected_rows > 0
     
+    def create_users(self, database_name: str, users: List[Tuple[str, str]]) -> int:
+        """Create multiple (username, email) users in one batch"""
+        for username, email in users:
+            if not username or not email:
+                raise ValueError("Username and email are required")
+        
+        with self.get_repository(UserRepository) as repo:
+            return repo.create_users(database_name, users)
+    
     def update_user_email(self, database_name: str, user_id: int, email: str) -> bool:
         """Update user email with validation"""
         if not email or "@" not in email:
@@ -1,5 +1,8 @@
 import os
-from typing import Dict, Any
+from collections import namedtuple
+from functools import cache
+from types import MappingProxyType
+from typing import Mapping
 from enum import Enum
 from dotenv import load_dotenv
 
@@ -12,32 +15,39 @@ class ServerType(Enum):
     VRVSQL2022 = "VRVSQL2022"
 
 
+ServerCfg = namedtuple("ServerCfg", "server username password port driver database")
+
+
 class DatabaseConfig:
     """データベース接続設定を管理するクラス"""
     
     @staticmethod
-    def get_connection_config() -> Dict[ServerType, Dict[str, Any]]:
-        """各データベースの接続設定を取得"""
-        return {
-            ServerType.SQL001: {
-                "server": os.getenv("SQL001_SERVER", "prod-server.example.com"),
-                "username": os.getenv("SQL001_USER", "prod_user"),
-                "password": os.getenv("SQL001_PASSWORD", "prod_password"),
-                "port": int(os.getenv("SQL001_PORT", "1433")),
-                "driver": "ODBC Driver 17 for SQL Server"
-            },
-            ServerType.SRVDB02: {
-                "server": os.getenv("SRVDB02_SERVER", "staging-server.example.com"),
-                "username": os.getenv("SRVDB02_USER", "staging_user"),
-                "password": os.getenv("SRVDB02_PASSWORD", "staging_password"),
-                "port": int(os.getenv("SRVDB02_PORT", "1433")),
-                "driver": "ODBC Driver 17 for SQL Server"
-            },
-            ServerType.VRVSQL2022: {
-                "server": os.getenv("VRVSQL2022_SERVER", "dev-server.example.com"),
-                "username": os.getenv("VRVSQL2022_USER", "dev_user"),
-                "password": os.getenv("VRVSQL2022_PASSWORD", "dev_password"),
-                "port": int(os.getenv("VRVSQL2022_PORT", "1433")),
-                "driver": "ODBC Driver 17 for SQL Server"
-            }
-        }
+    @cache
+    def get_connection_config() -> Mapping[ServerType, ServerCfg]:
+        """各データベースの接続設定を取得（初回呼び出し時に環境変数を読み込みキャッシュ）"""
+        return MappingProxyType({
+            ServerType.SQL001: ServerCfg(
+                server=os.getenv("SQL001_SERVER", "prod-server.example.com"),
+                username=os.getenv("SQL001_USER", "prod_user"),
+                password=os.getenv("SQL001_PASSWORD", "prod_password"),
+                port=int(os.getenv("SQL001_PORT", "1433")),
+                driver="ODBC Driver 17 for SQL Server",
+                database=os.getenv("SQL001_DATABASE", "")
+            ),
+            ServerType.SRVDB02: ServerCfg(
+                server=os.getenv("SRVDB02_SERVER", "staging-server.example.com"),
+                username=os.getenv("SRVDB02_USER", "staging_user"),
+                password=os.getenv("SRVDB02_PASSWORD", "staging_password"),
+                port=int(os.getenv("SRVDB02_PORT", "1433")),
+                driver="ODBC Driver 17 for SQL Server",
+                database=os.getenv("SRVDB02_DATABASE", "")
+            ),
+            ServerType.VRVSQL2022: ServerCfg(
+                server=os.getenv("VRVSQL2022_SERVER", "dev-server.example.com"),
+                username=os.getenv("VRVSQL2022_USER", "dev_user"),
+                password=os.getenv("VRVSQL2022_PASSWORD", "dev_password"),
+                port=int(os.getenv("VRVSQL2022_PORT", "1433")),
+                driver="ODBC Driver 17 for SQL Server",
+                database=os.getenv("VRVSQL2022_DATABASE", "")
+            )
+        })
@@ -1,53 +1,206 @@
+from functools import lru_cache
 from typing import Dict, Optional
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.pool import QueuePool
+import os
+import threading
+import time
+from sqlalchemy import create_engine, event, exc, Engine
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 import logging
 
-from .config import DatabaseConfig, ServerType
+from .config import DatabaseConfig, ServerCfg, ServerType
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=32)
+def _connection_string(config: ServerCfg) -> str:
+    """pymssql用の接続文字列を設定ごとに1度だけ構築（パスワードのURLエンコードを含む）"""
+    return (
+        f"mssql+pymssql://{config.username}:{quote_plus(config.password)}"
+        f"@{config.server}:{config.port}/{config.database}"
+    )
+
+
+# 1クエリあたりのタイムアウト（秒、pymssql を使う同期エンジンのみ）と
+# ロック待ちタイムアウト（ミリ秒、同期・非同期エンジンとも）
+QUERY_TIMEOUT_SECONDS = int(os.getenv("DB_QUERY_TIMEOUT", "30"))
+LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "5000"))
+
+
+def _install_lock_timeout(engine: Engine) -> None:
+    """新しい物理接続ごとに SET LOCK_TIMEOUT を発行するイベントを登録"""
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET LOCK_TIMEOUT {LOCK_TIMEOUT_MS}")
+        finally:
+            cursor.close()
+
+
+# この秒数以上アイドルだった接続のみチェックアウト時に疎通確認する
+IDLE_PING_SECONDS = float(os.getenv("DB_PING_IDLE_SECONDS", "60"))
+
+
+def _install_idle_ping(engine: Engine) -> None:
+    """pool_pre_ping の代わりに、長時間アイドルだった接続だけを確認するイベントを登録"""
+    
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+    
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin < IDLE_PING_SECONDS:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            # プールが接続を破棄して新しい接続で再試行する
+            raise exc.DisconnectionError() from e
+        finally:
+            cursor.close()
+
+
 class DatabaseConnectionManager:
-    """データベース接続を管理するクラス"""
+    """データベース接続を管理するクラス（プロセス内で1インスタンスを共有）"""
     
-    def __init__(self):
-        self._engines: Dict[ServerType, Engine] = {}
-        self._config = DatabaseConfig.get_connection_config()
+    _instance: Optional["DatabaseConnectionManager"] = None
+    _instance_lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._engines: Dict[ServerType, Engine] = {}
+                    instance._async_engines: Dict[ServerType, AsyncEngine] = {}
+                    instance._engines_lock = threading.RLock()
+                    instance._config = DatabaseConfig.get_connection_config()
+                    cls._instance = instance
+        return cls._instance
     
     def get_engine(self, db_connection: ServerType) -> Engine:
         """指定されたデータベース接続のEngineを取得"""
-        if db_connection not in self._engines:
-            self._engines[db_connection] = self._create_engine(db_connection)
-        return self._engines[db_connection]
+        engine = self._engines.get(db_connection)
+        if engine is None:
+            with self._engines_lock:
+                engine = self._engines.get(db_connection)
+                if engine is None:
+                    engine = self._engines[db_connection] = self._create_engine(db_connection)
+        return engine
+    
+    def get_async_engine(self, db_connection: ServerType) -> AsyncEngine:
+        """指定されたデータベース接続のAsyncEngine（aioodbc）を取得"""
+        engine = self._async_engines.get(db_connection)
+        if engine is None:
+            with self._engines_lock:
+                engine = self._async_engines.get(db_connection)
+                if engine is None:
+                    engine = self._async_engines[db_connection] = self._create_async_engine(db_connection)
+        return engine
+    
+    def _create_async_engine(self, db_connection: ServerType) -> AsyncEngine:
+        """SQLAlchemy AsyncEngineを作成"""
+        config = self._config[db_connection]
+        
+        # aioodbc用の接続URLを構築
+        url = URL.create(
+            "mssql+aioodbc",
+            username=config.username,
+            password=config.password,
+            host=config.server,
+            port=config.port,
+            database=config.database,
+            query={"driver": config.driver}
+        )
+        
+        engine = create_async_engine(
+            url,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "30")),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=3600,
+            echo=False
+        )
+        # aioodbc には pymssql の timeout に相当する接続オプションがないため、
+        # 非同期エンジンにはロック待ちタイムアウトのみ設定する
+        _install_lock_timeout(engine.sync_engine)
+        _install_idle_ping(engine.sync_engine)
+        
+        logger.info("Created async engine for %s", db_connection.value)
+        return engine
     
     def _create_engine(self, db_connection: ServerType) -> Engine:
         """SQLAlchemy Engineを作成"""
         config = self._config[db_connection]
         
         # pymssql用の接続文字列を構築
-        connection_string = (
-            f"mssql+pymssql://{config['username']}:{quote_plus(config['password'])}"
-            f"@{config['server']}:{config['port']}/{config['database']}"
-        )
+        connection_string = _connection_string(config)
+        
+        # プール方式（POOL_MODE）
+        #   queue  : 既定。プロセス内で接続を保持する QueuePool
+        #   null   : NullPool。ワーカー数が多く、外部の接続プーラー経由で接続する構成向け
+        #            （各ワーカーの QueuePool が合計でサーバーの最大接続数を超える場合）
+        #   static : StaticPool。単一接続を使い回すシングルスレッドのテスト向け
+        pool_mode = os.getenv("POOL_MODE", "queue").lower()
+        
+        # pymssql のクエリタイムアウト（長時間の SELECT が接続を占有し続けないようにする）
+        connect_args = {"timeout": QUERY_TIMEOUT_SECONDS}
+        
+        if pool_mode == "null":
+            engine = create_engine(connection_string, poolclass=NullPool, connect_args=connect_args, echo=False)
+            _install_lock_timeout(engine)
+            logger.info("Created engine for %s (pool_mode=null)", db_connection.value)
+            return engine
+        
+        if pool_mode == "static":
+            engine = create_engine(connection_string, poolclass=StaticPool, connect_args=connect_args, echo=False)
+            _install_lock_timeout(engine)
+            logger.info("Created engine for %s (pool_mode=static)", db_connection.value)
+            return engine
+        
+        # 接続プール設定（環境変数で上書き可能）
+        pool_size = int(os.getenv("DB_POOL_SIZE", "20"))
+        max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+        pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
         
         # Engineを作成（接続プール設定も含む）
         engine = create_engine(
             connection_string,
             poolclass=QueuePool,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
             pool_recycle=3600,
+            connect_args=connect_args,
             echo=False  # 本番環境ではFalseに設定
         )
+        _install_lock_timeout(engine)
+        _install_idle_ping(engine)
         
-        logger.info(f"Created engine for {db_connection.value}")
+        logger.info(
+            "Created engine for %s (pool_mode=queue, pool_size=%s, max_overflow=%s, pool_timeout=%s)",
+            db_connection.value, pool_size, max_overflow, pool_timeout
+        )
         return engine
     
     def close_all_connections(self):
         """全ての接続を閉じる"""
-        for db_connection, engine in self._engines.items():
-            engine.dispose()
-            logger.info(f"Closed connection for {db_connection.value}")
-        self._engines.clear()
+        with self._engines_lock:
+            for db_connection, engine in self._engines.items():
+                engine.dispose()
+                logger.info("Closed connection for %s", db_connection.value)
+            self._engines.clear()
+    
+    async def close_all_async_connections(self):
+        """全ての非同期接続を閉じる"""
+        for db_connection, engine in list(self._async_engines.items()):
+            await engine.dispose()
+            logger.info("Closed async connection for %s", db_connection.value)
+        self._async_engines.clear()
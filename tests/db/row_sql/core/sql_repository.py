@@ -1,7 +1,21 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+import hashlib
+import re
+import threading
+import time
 import pandas as pd
-from sqlalchemy import text
-from sqlalchemy.engine import Result, Engine
+from sqlalchemy import text, TextClause
+try:
+    import connectorx as cx
+except ImportError:  # connectorx は任意依存
+    cx = None
+from sqlalchemy.engine import Result, Engine, URL
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
 import logging
 
 from .database_enum import DatabaseConnection
@@ -9,11 +23,99 @@ from .connection_manager import DatabaseConnectionManager
 
 logger = logging.getLogger(__name__)
 
+
+class QueryTimeoutError(Exception):
+    """クエリがタイムアウトした場合の例外
+
+    DB_QUERY_TIMEOUT（pymssql のクエリタイムアウト、同期エンジンのみ）と
+    SET LOCK_TIMEOUT によるロック待ちタイムアウト（エラー1222、同期・非同期とも）が対象
+    """
+    pass
+
+
+# SQL Server のロック待ちタイムアウト（"Lock request time out period exceeded"）
+LOCK_TIMEOUT_ERROR_NUMBER = 1222
+# pymssql（DB-Library）のクエリタイムアウト（SYBETIME）
+PYMSSQL_QUERY_TIMEOUT_ERROR_NUMBER = 20003
+# ODBC（aioodbc/pyodbc）のクエリタイムアウト（HYT01 の接続タイムアウトは対象外）
+ODBC_QUERY_TIMEOUT_SQLSTATE = "HYT00"
+
+# バッチ先頭に単独で置く必要があるDDL（他の文と連結できない）
+_BATCH_FIRST_STATEMENT = re.compile(
+    r"^\s*(?:CREATE\s+(?:OR\s+ALTER\s+)?|ALTER\s+)"
+    r"(?:VIEW|PROC|PROCEDURE|FUNCTION|TRIGGER|SCHEMA|DEFAULT|RULE)\b",
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=512)
+def _text(sql: str) -> TextClause:
+    """SQL文字列ごとにTextClauseを1度だけ生成して再利用"""
+    return text(sql)
+
+
+@lru_cache(maxsize=32)
+def _connectorx_url(url: URL) -> str:
+    """エンジンのURLから connectorx 用の接続文字列を1度だけ生成"""
+    return url.set(drivername="mssql").render_as_string(hide_password=False)
+
+
+class QueryResultCache:
+    """読み取りクエリ結果のLRU+TTLキャッシュ（スレッドセーフ）"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def make_key(sql: str, db_connection: DatabaseConnection, params: Optional[Dict[str, Any]]) -> Tuple[str, bytes]:
+        """SQLとバインドパラメータからキャッシュキーを作成"""
+        digest = hashlib.blake2b((sql + repr(sorted((params or {}).items()))).encode()).digest()
+        return db_connection.value, digest
+    
+    def get(self, key: Tuple[str, bytes]) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, rows = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return rows
+    
+    def set(self, key: Tuple[str, bytes], rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, db_connection: Optional[DatabaseConnection] = None) -> None:
+        """キャッシュを破棄（db_connection指定時はその接続先のみ）"""
+        with self._lock:
+            if db_connection is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == db_connection.value]:
+                del self._entries[key]
+
+
+# 全SqlRepositoryインスタンスで共有する結果キャッシュ
+_query_cache = QueryResultCache()
+
+
 class SqlRepository:
     """生SQL実行用のリポジトリクラス"""
     
+    BATCH_CHUNK_SIZE = 100
+    
     def __init__(self):
         self.connection_manager = DatabaseConnectionManager()
+        self.query_cache = _query_cache
     
     def _get_engine(self, db_connection: DatabaseConnection) -> Engine:
         """エンジンを取得する内部メソッド"""
@@ -32,30 +134,117 @@ class SqlRepository:
         with engine.connect() as connection:
             if with_transaction:
                 with connection.begin():
-                    return connection.execute(text(sql), params or {})
+                    return connection.execute(_text(sql), params or {})
             else:
-                return connection.execute(text(sql), params or {})
+                return connection.execute(_text(sql), params or {})
+    
+    @staticmethod
+    def _raise_if_timeout(error: Exception) -> None:
+        """クエリ・ロック待ちのタイムアウトであれば QueryTimeoutError に変換して送出
+
+        ログイン・接続タイムアウトは対象外とし、メッセージ文言ではなくエラー番号で判定する
+        """
+        if not isinstance(error, DBAPIError) or error.orig is None or not error.orig.args:
+            return
+        
+        error_code = error.orig.args[0]
+        if error_code in (
+            LOCK_TIMEOUT_ERROR_NUMBER,
+            PYMSSQL_QUERY_TIMEOUT_ERROR_NUMBER,
+            ODBC_QUERY_TIMEOUT_SQLSTATE
+        ):
+            raise QueryTimeoutError("timeout") from error
+        
+        # pyodbc は SQLSTATE（1222 では 42000）を返すため、ネイティブエラー番号
+        # "(1222)" が付与されたメッセージのみロック待ちタイムアウトとみなす
+        if (
+            isinstance(error_code, str)
+            and len(error.orig.args) > 1
+            and f"({LOCK_TIMEOUT_ERROR_NUMBER})" in str(error.orig.args[1])
+        ):
+            raise QueryTimeoutError("timeout") from error
     
     def _log_error(self, operation: str, db_connection: DatabaseConnection, error: Exception):
         """エラーログを出力する共通メソッド"""
-        logger.error(f"{operation} failed for {db_connection.value}: {error}")
+        logger.error("%s failed for %s: %s", operation, db_connection.value, error)
     
     def execute_query(
         self, 
         sql: str, 
         db_connection: DatabaseConnection,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        cache: bool = False
     ) -> List[Dict[str, Any]]:
-        """SELECT文を実行してdict形式のリストで結果を返す"""
+        """SELECT文を実行してdict形式のリストで結果を返す
+
+        cache=True の場合、同一SQL・同一パラメータの結果をTTLの間キャッシュから返す。
+        EXEC や OUTPUT 句付きのDMLなど副作用のある文が実行されなくなるため、
+        読み取り専用のクエリでのみ指定すること
+        """
+        key = QueryResultCache.make_key(sql, db_connection, params) if cache else None
+        if key is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return [dict(row) for row in cached]
+        
         try:
             result: Result = self._execute_with_connection(sql, db_connection, params)
-            # 結果をdict形式で取得
-            columns = result.keys()
-            rows = result.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+            # 結果をdict形式で取得（キーとの対応付けはRowMapping側で行う）
+            records = [dict(row) for row in result.mappings()]
                 
         except Exception as e:
             self._log_error("Query execution", db_connection, e)
+            self._raise_if_timeout(e)
+            raise
+        
+        if key is not None:
+            self.query_cache.set(key, [dict(row) for row in records])
+        return records
+    
+    def stream_query(
+        self, 
+        sql: str, 
+        db_connection: DatabaseConnection,
+        params: Optional[Dict[str, Any]] = None,
+        chunksize: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """SELECT文をサーバーサイドカーソルで実行し、1行ずつdictで返すジェネレータ
+
+        接続はジェネレータを最後まで読むか close() するまで保持される
+        """
+        engine = self._get_engine(db_connection)
+        
+        try:
+            with engine.connect() as connection:
+                result = connection.execution_options(
+                    stream_results=True, yield_per=chunksize
+                ).execute(_text(sql), params or {})
+                for partition in result.mappings().partitions(chunksize):
+                    for row in partition:
+                        yield dict(row)
+                        
+        except Exception as e:
+            self._log_error("Streaming query execution", db_connection, e)
+            self._raise_if_timeout(e)
+            raise
+    
+    async def execute_query_async(
+        self, 
+        sql: str, 
+        db_connection: DatabaseConnection,
+        params: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """SELECT文を非同期で実行してdict形式のリストで結果を返す"""
+        engine: AsyncEngine = self.connection_manager.get_async_engine(db_connection)
+        
+        try:
+            async with engine.connect() as connection:
+                result = await connection.execute(_text(sql), params or {})
+                return [dict(row) for row in result.mappings()]
+                
+        except Exception as e:
+            self._log_error("Async query execution", db_connection, e)
+            self._raise_if_timeout(e)
             raise
     
     def execute_query_to_dataframe(
@@ -64,28 +253,78 @@ class SqlRepository:
         db_connection: DatabaseConnection,
         params: Optional[Dict[str, Any]] = None
     ) -> pd.DataFrame:
-        """SELECT文を実行してDataFrameで結果を返す"""
+        """SELECT文を実行してDataFrameで結果を返す
+
+        connectorx が利用可能でパラメータなしの場合は Arrow 経由で列単位に取得する
+        （connectorx で失敗した場合は pandas 経由で取得し直す）
+        """
         engine = self._get_engine(db_connection)
         
+        if cx is not None and not params:
+            try:
+                table = cx.read_sql(_connectorx_url(engine.url), sql, return_type="arrow")
+                return table.to_pandas(types_mapper=pd.ArrowDtype)
+            except Exception as e:
+                # 未対応の型や接続文字列の不一致などは pandas 経由の取得にフォールバック
+                logger.warning("connectorx read failed for %s, falling back to pandas: %s", db_connection.value, e)
+        
         try:
-            return pd.read_sql(text(sql), engine, params=params or {})
+            return pd.read_sql(_text(sql), engine, params=params or {})
         except Exception as e:
             self._log_error("Query execution to DataFrame", db_connection, e)
+            self._raise_if_timeout(e)
             raise
     
     def execute_non_query(
         self, 
         sql: str, 
         db_connection: DatabaseConnection,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        autocommit: bool = False
     ) -> int:
-        """INSERT/UPDATE/DELETE文を実行して影響行数を返す"""
+        """INSERT/UPDATE/DELETE文を実行して影響行数を返す
+
+        1文ごとに engine.begin() で BEGIN/COMMIT を1回だけ発行する。
+        autocommit=True の場合は AUTOCOMMIT 接続で実行し、明示的なトランザクションを張らない。
+        複数文をまとめて原子的に実行したい場合は execute_batch を使用すること。
+        """
+        engine = self._get_engine(db_connection)
+        
         try:
-            result: Result = self._execute_with_connection(sql, db_connection, params, with_transaction=True)
+            if autocommit:
+                with engine.connect() as connection:
+                    result: Result = connection.execution_options(
+                        isolation_level="AUTOCOMMIT"
+                    ).execute(_text(sql), params or {})
+            else:
+                with engine.begin() as connection:
+                    result = connection.execute(_text(sql), params or {})
+            self.query_cache.invalidate(db_connection)
             return result.rowcount
                     
         except Exception as e:
             self._log_error("Non-query execution", db_connection, e)
+            self._raise_if_timeout(e)
+            raise
+    
+    async def execute_non_query_async(
+        self, 
+        sql: str, 
+        db_connection: DatabaseConnection,
+        params: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """INSERT/UPDATE/DELETE文を非同期で実行して影響行数を返す"""
+        engine: AsyncEngine = self.connection_manager.get_async_engine(db_connection)
+        
+        try:
+            async with engine.begin() as connection:
+                result = await connection.execute(_text(sql), params or {})
+            self.query_cache.invalidate(db_connection)
+            return result.rowcount
+                    
+        except Exception as e:
+            self._log_error("Async non-query execution", db_connection, e)
+            self._raise_if_timeout(e)
             raise
     
     def execute_batch(
@@ -93,17 +332,70 @@ class SqlRepository:
         sql_statements: List[str], 
         db_connection: DatabaseConnection
     ) -> None:
-        """複数のSQL文をバッチで実行"""
+        """複数のSQL文をバッチで実行
+
+        BATCH_CHUNK_SIZE 件ずつ1つのバッチに連結し、1往復で送信する。
+        CREATE VIEW/PROCEDURE/FUNCTION/TRIGGER などバッチ先頭に置く必要がある文は
+        連結せず1文ずつ実行する。
+        いずれかの文が失敗した場合はトランザクション全体をロールバックする
+        """
         engine = self._get_engine(db_connection)
         
         try:
             with engine.connect() as connection:
                 with connection.begin():  # トランザクション管理
+                    chunk: List[str] = []
                     for sql in sql_statements:
-                        connection.execute(text(sql))
+                        # 末尾の ; は連結時に付け直すため取り除く
+                        statement = sql.strip().rstrip(";").rstrip()
+                        if not statement:
+                            continue
+                        if _BATCH_FIRST_STATEMENT.match(statement):
+                            self._execute_chunk(connection, chunk)
+                            chunk = []
+                            connection.execute(text(statement))
+                            continue
+                        chunk.append(statement)
+                        if len(chunk) >= self.BATCH_CHUNK_SIZE:
+                            self._execute_chunk(connection, chunk)
+                            chunk = []
+                    self._execute_chunk(connection, chunk)
+            self.query_cache.invalidate(db_connection)
+                        
+        except Exception as e:
+            self._log_error("Batch execution", db_connection, e)
+            self._raise_if_timeout(e)
+            raise
+    
+    @staticmethod
+    def _execute_chunk(connection, statements: List[str]) -> None:
+        """複数のSQL文を TRY/CATCH で囲んだ1つのバッチとして送信"""
+        if not statements:
+            return
+        joined = ";\n".join(statements)
+        # text() 経由で実行し、文中の % などをドライバのパラメータ形式に合わせてエスケープする
+        connection.execute(
+            text(f"BEGIN TRY\n{joined};\nEND TRY\nBEGIN CATCH\nTHROW;\nEND CATCH")
+        )
+    
+    def execute_batch_with_params(
+        self, 
+        statements: List[Tuple[str, Dict[str, Any]]], 
+        db_connection: DatabaseConnection
+    ) -> None:
+        """パラメータ付きSQL文をバッチで実行（連続する同一SQLはexecutemanyにまとめる）"""
+        engine = self._get_engine(db_connection)
+        
+        try:
+            with engine.connect() as connection:
+                with connection.begin():  # トランザクション管理
+                    for sql, group in groupby(statements, key=itemgetter(0)):
+                        connection.execute(_text(sql), [params for _, params in group])
+            self.query_cache.invalidate(db_connection)
                         
         except Exception as e:
             self._log_error("Batch execution", db_connection, e)
+            self._raise_if_timeout(e)
             raise
     
     def close_connections(self):
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import logging
 
 from ..core.sql_repository import SqlRepository
@@ -6,11 +6,14 @@ from ..core.database_enum import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# SqlRepository はステートレスなため全サービスインスタンスで共有する
+_REPO = SqlRepository()
+
 class EmployeeService:
     """Employeeテーブル取得用サービス"""
 
     def __init__(self, db_connection: DatabaseConnection):
-        self.repo = SqlRepository()
+        self.repo = _REPO
         self.db_connection = db_connection
 
     def get_employee(self, employee_id: int) -> Optional[Dict[str, Any]]:
@@ -20,7 +23,7 @@ class EmployeeService:
         """
         sql = "SELECT * FROM employee WHERE id = :id"
         try:
-            rows = self.repo.execute_query(sql, self.db_connection, params={"id": employee_id})
+            rows = self.repo.execute_query(sql, self.db_connection, params={"id": employee_id}, cache=True)
             return rows[0] if rows else None
         except Exception as e:
             logger.exception("Failed to get employee id=%s", employee_id)
@@ -33,7 +36,45 @@ class EmployeeService:
         sql = "SELECT * FROM employee"
 
         try:
-            return self.repo.execute_query(sql, self.db_connection)
+            return self.repo.execute_query(sql, self.db_connection, cache=True)
+        except Exception:
+            logger.exception("Failed to list employees")
+            raise
+    
+    def iter_employees(self, chunksize: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Employeeテーブルを1行ずつ返すイテレータ。
+        大量データのエクスポートなど、全件をメモリに載せたくない場合に使用する。
+        """
+        sql = "SELECT * FROM employee"
+
+        try:
+            yield from self.repo.stream_query(sql, self.db_connection, chunksize=chunksize)
+        except Exception:
+            logger.exception("Failed to stream employees")
+            raise
+
+    async def get_employee_async(self, employee_id: int) -> Optional[Dict[str, Any]]:
+        """
+        get_employee の非同期版。
+        asyncio.gather で他のクエリと並行して実行できる。
+        """
+        sql = "SELECT * FROM employee WHERE id = :id"
+        try:
+            rows = await self.repo.execute_query_async(sql, self.db_connection, params={"id": employee_id})
+            return rows[0] if rows else None
+        except Exception:
+            logger.exception("Failed to get employee id=%s", employee_id)
+            raise
+
+    async def list_employees_async(self) -> List[Dict[str, Any]]:
+        """
+        list_employees の非同期版。
+        """
+        sql = "SELECT * FROM employee"
+
+        try:
+            return await self.repo.execute_query_async(sql, self.db_connection)
         except Exception:
             logger.exception("Failed to list employees")
             raise
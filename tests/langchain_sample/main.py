@@ -45,6 +45,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down services...")
     if document_service and document_service.db:
         await document_service.db.close_connections()
+    if llm_service:
+        llm_service.shutdown()
 
 app = FastAPI(
     title="AI Server with MCP Support",
@@ -1,5 +1,6 @@
-import redis
+import redis.asyncio as redis
 import logging
+import os
 from typing import Dict, Any, Optional, List
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
@@ -8,6 +9,11 @@ import asyncio
 
 logger = logging.getLogger(__name__)
 
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_POOL", 100))
+
+# Must match the COSINE / IVF_FLAT index created in _setup_milvus_collection
+MILVUS_SEARCH_PARAMS = {"metric_type": "COSINE", "params": {"nprobe": 10}}
+
 class DatabaseService:
     def __init__(self, 
                  redis_url: str = "redis://localhost:6379",
@@ -16,6 +22,7 @@ class DatabaseService:
                  milvus_port: int = 19530):
         # Redis (Key-Value DB)
         self.redis_url = redis_url
+        self.redis_pool = None
         self.redis_client = None
         
         # MongoDB (Document DB)
@@ -31,9 +38,14 @@ class DatabaseService:
     async def initialize(self):
         """Initialize all database connections"""
         try:
-            # Initialize Redis
-            self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
-            await asyncio.to_thread(self.redis_client.ping)
+            # Initialize Redis (one pooled async client shared by every call)
+            self.redis_pool = redis.ConnectionPool.from_url(
+                self.redis_url,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                decode_responses=True
+            )
+            self.redis_client = redis.Redis(connection_pool=self.redis_pool)
+            await self.redis_client.ping()
             logger.info("Redis connection established")
             
             # Initialize MongoDB
@@ -96,9 +108,7 @@ class DatabaseService:
             if isinstance(value, (dict, list)):
                 value = json.dumps(value)
             
-            result = await asyncio.to_thread(
-                self.redis_client.set, key, value, ex=expire
-            )
+            result = await self.redis_client.set(key, value, ex=expire)
             return result
         except Exception as e:
             logger.error(f"Redis set error: {e}")
@@ -107,21 +117,26 @@ class DatabaseService:
     async def redis_get(self, key: str) -> Optional[Any]:
         """Get value from Redis"""
         try:
-            value = await asyncio.to_thread(self.redis_client.get, key)
-            if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
-            return None
+            value = await self.redis_client.get(key)
+            return self._decode_redis_value(value)
         except Exception as e:
             logger.error(f"Redis get error: {e}")
             raise
     
+    @staticmethod
+    def _decode_redis_value(value: Optional[str]) -> Optional[Any]:
+        if value:
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return value
+        return None
+    
     async def redis_delete(self, key: str) -> bool:
         """Delete key from Redis"""
         try:
-            result = await asyncio.to_thread(self.redis_client.delete, key)
+            # UNLINK frees the value in the background, so large keys don't block Redis
+            result = await self.redis_client.unlink(key)
             return bool(result)
         except Exception as e:
             logger.error(f"Redis delete error: {e}")
@@ -176,8 +191,11 @@ class DatabaseService:
             raise
     
     # Milvus operations (Vector DB)
-    async def milvus_insert_vectors(self, vectors_data: List[Dict[str, Any]]) -> List[str]:
-        """Insert vectors into Milvus"""
+    async def milvus_insert_vectors(self, vectors_data: List[Dict[str, Any]], flush: bool = True) -> List[str]:
+        """Insert vectors into Milvus
+
+        Pass flush=False when inserting several batches and call milvus_flush once at the end.
+        """
         try:
             data = [
                 [item["id"] for item in vectors_data],
@@ -188,22 +206,29 @@ class DatabaseService:
             ]
             
             result = await asyncio.to_thread(self.milvus_collection.insert, data)
-            await asyncio.to_thread(self.milvus_collection.flush)
+            if flush:
+                await asyncio.to_thread(self.milvus_collection.flush)
             return result.primary_keys
         except Exception as e:
             logger.error(f"Milvus insert error: {e}")
             raise
     
+    async def milvus_flush(self) -> None:
+        """Flush pending Milvus inserts"""
+        try:
+            await asyncio.to_thread(self.milvus_collection.flush)
+        except Exception as e:
+            logger.error(f"Milvus flush error: {e}")
+            raise
+    
     async def milvus_search_vectors(self, query_vector: List[float], top_k: int = 5, expr: Optional[str] = None) -> List[Dict[str, Any]]:
         """Search similar vectors in Milvus"""
         try:
-            search_params = {"metric_type": "COSINE", "params": {"nprobe": 10}}
-            
             results = await asyncio.to_thread(
                 self.milvus_collection.search,
                 [query_vector],
                 "embedding",
-                search_params,
+                MILVUS_SEARCH_PARAMS,
                 limit=top_k,
                 expr=expr,
                 output_fields=["doc_id", "chunk_id", "text"]
@@ -226,11 +251,15 @@ class DatabaseService:
             logger.error(f"Milvus search error: {e}")
             raise
     
-    async def milvus_delete_vectors(self, expr: str) -> bool:
-        """Delete vectors from Milvus"""
+    async def milvus_delete_vectors(self, expr: str, flush: bool = True) -> bool:
+        """Delete vectors from Milvus
+
+        Pass flush=False when deleting in several calls and call milvus_flush once at the end.
+        """
         try:
             result = await asyncio.to_thread(self.milvus_collection.delete, expr)
-            await asyncio.to_thread(self.milvus_collection.flush)
+            if flush:
+                await asyncio.to_thread(self.milvus_collection.flush)
             return True
         except Exception as e:
             logger.error(f"Milvus delete error: {e}")
@@ -240,7 +269,9 @@ class DatabaseService:
         """Close all database connections"""
         try:
             if self.redis_client:
-                await asyncio.to_thread(self.redis_client.close)
+                await self.redis_client.aclose()
+            if self.redis_pool:
+                await self.redis_pool.disconnect()
             
             if self.mongo_client:
                 self.mongo_client.close()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import uuid
 import logging
@@ -162,18 +163,18 @@ class DocumentService:
     async def delete_document(self, doc_id: str) -> bool:
         """Delete document and all related data"""
         try:
-            # Delete from vector store (Milvus)
-            await self.vector_store.delete_documents([doc_id])
+            # Look up the stored file before the metadata is removed
+            documents = await self.db.mongo_find_documents("documents", {"doc_id": doc_id}, limit=1)
             
-            # Delete from MongoDB
-            deleted_count = await self.db.mongo_delete_documents("documents", {"doc_id": doc_id})
-            
-            # Delete from Redis cache
+            # Delete from vector store (Milvus), MongoDB and Redis cache concurrently
             cache_key = f"doc:{doc_id}"
-            await self.db.redis_delete(cache_key)
+            _, deleted_count, _ = await asyncio.gather(
+                self.vector_store.delete_documents([doc_id]),
+                self.db.mongo_delete_documents("documents", {"doc_id": doc_id}),
+                self.db.redis_delete(cache_key)
+            )
             
             # Delete physical file if exists
-            documents = await self.db.mongo_find_documents("documents", {"doc_id": doc_id})
             if documents:
                 file_path = documents[0].get("file_path")
                 if file_path and os.path.exists(file_path):
@@ -1,6 +1,10 @@
 import asyncio
+import hashlib
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+import numpy as np
 from langchain_ollama import OllamaLLM
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.callbacks.manager import CallbackManager
@@ -8,11 +12,24 @@ from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 
 logger = logging.getLogger(__name__)
 
+# Default number of concurrent blocking LLM calls. The default asyncio executor
+# is capped at min(32, cpu_count + 4), which throttles fan-out to Ollama.
+DEFAULT_MAX_PARALLEL_REQUESTS = int(os.getenv("LLM_POOL_SIZE", (os.cpu_count() or 1) * 5))
+
+EMBEDDING_DIMENSION = 384
+
 class LLMService:
-    def __init__(self, ollama_url: str = "http://localhost:11434", model_name: str = "llama2"):
+    def __init__(self, ollama_url: str = "http://localhost:11434", model_name: str = "llama2",
+                 max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS):
         self.ollama_url = ollama_url
         self.model_name = model_name
         self.llm = None
+        self.max_parallel_requests = max_parallel_requests
+        # Dedicated pool so LLM calls don't compete with other to_thread work
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_parallel_requests,
+            thread_name_prefix="llm"
+        )
         
     async def initialize(self):
         """Initialize the Ollama LLM connection"""
@@ -36,8 +53,12 @@ class LLMService:
     
     async def _async_invoke(self, prompt: str) -> str:
         """Async wrapper for LLM invocation"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.llm.invoke, prompt)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.llm.invoke, prompt)
+    
+    def shutdown(self):
+        """Release the LLM worker threads"""
+        self._executor.shutdown(wait=False)
     
     async def chat(self, message: str, context: Optional[str] = None) -> str:
         """Chat with the LLM"""
@@ -56,6 +77,10 @@ class LLMService:
     
     async def generate_embeddings(self, text: str) -> list:
         """Generate embeddings for text (placeholder for future implementation)"""
-        # This would typically use a separate embedding model
-        # For now, return a simple hash-based representation
-        return [hash(text) % 1000 / 1000.0] * 384  # Simulated 384-dim embedding
+        # This would typically use a separate embedding model.
+        # For now, seed a RNG from a stable digest of the text so identical texts map
+        # to the same unit vector (Python's hash() is randomized per process).
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSION, dtype=np.float32)
+        vector /= np.linalg.norm(vector)
+        return vector.tolist()
@@ -186,21 +186,24 @@ class TextProcessingService:
             query_embedding = self.embedding_model.encode([query], convert_to_tensor=True)
             query_embedding_np = query_embedding.cpu().numpy()[0]
             
-            # Calculate similarities
-            similarities = []
-            for item in embeddings_db:
-                item_embedding = np.array(item["embedding"])
-                similarity = np.dot(query_embedding_np, item_embedding) / (
-                    np.linalg.norm(query_embedding_np) * np.linalg.norm(item_embedding)
-                )
-                similarities.append({
-                    "similarity": float(similarity),
-                    "chunk": item
-                })
-            
-            # Sort by similarity and return top_k
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
-            return similarities[:top_k]
+            if not embeddings_db or top_k <= 0:
+                return []
+            
+            # Calculate all cosine similarities with one matrix-vector product
+            query_vector = query_embedding_np.astype(np.float32, copy=False)
+            matrix = np.asarray([item["embedding"] for item in embeddings_db], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+            scores = (matrix @ query_vector) / np.maximum(norms, np.finfo(np.float32).tiny)
+            
+            # Select top_k without sorting the whole array
+            k = min(top_k, len(scores))
+            top_indices = np.argpartition(-scores, k - 1)[:k]
+            top_indices = top_indices[np.argsort(-scores[top_indices], kind="stable")]
+            
+            return [
+                {"similarity": float(scores[i]), "chunk": embeddings_db[i]}
+                for i in top_indices
+            ]
             
         except Exception as e:
             logger.error(f"Similarity search error: {e}")
@@ -1,10 +1,47 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import uuid
 from .database_service import DatabaseService
 
 logger = logging.getLogger(__name__)
 
+# Rows per Milvus insert call and number of insert calls in flight
+MILVUS_INSERT_BATCH_SIZE = int(os.getenv("MILVUS_BATCH", 1024))
+MILVUS_INSERT_CONCURRENCY = int(os.getenv("MILVUS_CONC", 4))
+
+# doc_ids per Milvus delete expression
+MILVUS_DELETE_BATCH_SIZE = 500
+
+# Milvus VARCHAR max_length is counted in UTF-8 bytes, not characters
+MILVUS_TEXT_MAX_BYTES = 65535
+
+def _truncate_utf8(text: str, max_bytes: int = MILVUS_TEXT_MAX_BYTES) -> str:
+    """Truncate text to at most max_bytes of UTF-8 without splitting a character"""
+    if text.isascii():
+        return text[:max_bytes]
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", "ignore")
+
+# doc_id values are generated with uuid4; anything else is rejected before it reaches an expr
+_DOC_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,100}$")
+
+def _doc_id_expr(doc_ids) -> str:
+    """Build a Milvus boolean expression matching the given doc_ids"""
+    if isinstance(doc_ids, str):
+        doc_ids = [doc_ids]
+    valid_ids = [doc_id for doc_id in doc_ids if _DOC_ID_RE.match(doc_id)]
+    if len(valid_ids) != len(doc_ids):
+        logger.warning(f"Ignoring {len(doc_ids) - len(valid_ids)} malformed doc_id(s) in filter")
+    if len(valid_ids) == 1:
+        return f'doc_id == "{valid_ids[0]}"'
+    return "doc_id in [" + ",".join(f'"{doc_id}"' for doc_id in valid_ids) + "]"
+
 class VectorStoreService:
     def __init__(self, database_service: DatabaseService):
         self.db = database_service
@@ -16,41 +53,57 @@ class VectorStoreService:
     async def add_documents(self, processed_chunks: List[Dict[str, Any]]) -> List[str]:
         """Add processed document chunks to Milvus vector store"""
         try:
-            vectors_data = []
+            # Rows are produced lazily so at most CONCURRENCY batches exist at once
+            rows = self._vector_rows(processed_chunks)
+            semaphore = asyncio.Semaphore(MILVUS_INSERT_CONCURRENCY)
             
-            for chunk in processed_chunks:
-                vector_id = str(uuid.uuid4())
-                
-                vector_data = {
-                    "id": vector_id,
-                    "doc_id": chunk["doc_id"],
-                    "chunk_id": chunk["chunk_id"],
-                    "embedding": chunk["embedding"],
-                    "text": chunk["text"][:65535]  # Milvus VARCHAR limit
-                }
-                vectors_data.append(vector_data)
+            async def _insert(batch: List[Dict[str, Any]]) -> List[str]:
+                try:
+                    return await self.db.milvus_insert_vectors(batch, flush=False)
+                finally:
+                    semaphore.release()
+            
+            # Insert into Milvus in fixed-size batches with bounded concurrency
+            tasks = []
+            while batch := list(islice(rows, MILVUS_INSERT_BATCH_SIZE)):
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(_insert(batch)))
+            
+            batch_results = await asyncio.gather(*tasks)
+            await self.db.milvus_flush()
             
-            # Insert into Milvus
-            result_ids = await self.db.milvus_insert_vectors(vectors_data)
+            result_ids = [pk for ids in batch_results for pk in ids]
             
-            logger.info(f"Added {len(vectors_data)} chunks to Milvus vector store")
+            logger.info(f"Added {len(result_ids)} chunks to Milvus vector store")
             return result_ids
             
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {e}")
             raise
     
+    @staticmethod
+    def _vector_rows(processed_chunks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield Milvus insert rows for processed chunks"""
+        for chunk in processed_chunks:
+            yield {
+                "id": str(uuid.uuid4()),
+                "doc_id": chunk["doc_id"],
+                "chunk_id": chunk["chunk_id"],
+                "embedding": chunk["embedding"],
+                "text": _truncate_utf8(chunk["text"])
+            }
+    
     async def search(self, query_embedding: List[float], top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """Search vector store with embedding"""
         try:
             # Build Milvus expression for filtering
             expr = None
             if filters and "doc_id" in filters:
-                if "$in" in filters["doc_id"]:
-                    doc_ids = filters["doc_id"]["$in"]
-                    expr = f"doc_id in {doc_ids}"
+                doc_id_filter = filters["doc_id"]
+                if isinstance(doc_id_filter, dict) and "$in" in doc_id_filter:
+                    expr = _doc_id_expr(doc_id_filter["$in"])
                 else:
-                    expr = f"doc_id == '{filters['doc_id']}'"
+                    expr = _doc_id_expr(doc_id_filter)
             
             # Search in Milvus
             results = await self.db.milvus_search_vectors(
@@ -108,11 +161,15 @@ class VectorStoreService:
     async def delete_documents(self, doc_ids: List[str]) -> int:
         """Delete documents by doc_id from Milvus"""
         try:
-            # Build expression for deletion
-            expr = f"doc_id in {doc_ids}"
-            
-            # Delete from Milvus
-            await self.db.milvus_delete_vectors(expr)
+            # Delete from Milvus in parallel batches, then flush once
+            await asyncio.gather(*[
+                self.db.milvus_delete_vectors(
+                    _doc_id_expr(doc_ids[i:i + MILVUS_DELETE_BATCH_SIZE]),
+                    flush=False
+                )
+                for i in range(0, len(doc_ids), MILVUS_DELETE_BATCH_SIZE)
+            ])
+            await self.db.milvus_flush()
             
             logger.info(f"Deleted chunks for doc_ids: {doc_ids}")
             return len(doc_ids)  # Approximate count
@@ -120,74 +177,3 @@ class VectorStoreService:
         except Exception as e:
             logger.error(f"Error deleting documents: {e}")
             raise
-            )
-            
-            # Execute query
-            response = query_engine.query(query)
-            
-            # Extract source information
-            sources = []
-            if hasattr(response, 'source_nodes'):
-                for node in response.source_nodes:
-                    sources.append({
-                        "node_id": node.id_,
-                        "text": node.text,
-                        "metadata": node.metadata,
-                        "score": getattr(node, 'score', 0.0)
-                    })
-            
-            return {
-                "answer": str(response),
-                "sources": sources,
-                "query": query
-            }
-            
-        except Exception as e:
-            logger.error(f"LLM query error: {e}")
-            raise
-    
-    async def get_collection_stats(self) -> Dict[str, Any]:
-        """Get vector store statistics"""
-        try:
-            count = self.collection.count()
-            
-            # Get sample of documents for analysis
-            if count > 0:
-                sample = self.collection.peek(limit=min(10, count))
-                sample_metadata = sample["metadatas"] if sample["metadatas"] else []
-            else:
-                sample_metadata = []
-            
-            return {
-                "total_documents": count,
-                "collection_name": self.collection.name,
-                "sample_metadata": sample_metadata[:5],  # First 5 samples
-                "persist_directory": self.persist_directory
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting collection stats: {e}")
-            raise
-    
-    async def delete_documents(self, doc_ids: List[str]) -> int:
-        """Delete documents by doc_id"""
-        try:
-            # Query for documents with matching doc_ids
-            results = self.collection.get(
-                where={"doc_id": {"$in": doc_ids}},
-                include=["metadatas"]
-            )
-            
-            if results["ids"]:
-                # Delete by IDs
-                self.collection.delete(ids=results["ids"])
-                deleted_count = len(results["ids"])
-                logger.info(f"Deleted {deleted_count} chunks for doc_ids: {doc_ids}")
-                return deleted_count
-            else:
-                logger.warning(f"No documents found for doc_ids: {doc_ids}")
-                return 0
-                
-        except Exception as e:
-            logger.error(f"Error deleting documents: {e}")
-            raise
@@ -1,78 +1,76 @@
 import os
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseConfig:
     """データベース設定クラス"""
     
     # Milvus設定
-    MILVUS_HOST = "localhost"
-    MILVUS_PORT = 19530
-    MILVUS_COLLECTION_NAME = "document_vectors"
-    MILVUS_DIMENSION = 1536  # text-embedding-ada-002の次元数
+    MILVUS_HOST: str = "localhost"
+    MILVUS_PORT: int = 19530
+    MILVUS_COLLECTION_NAME: str = "document_vectors"
+    MILVUS_DIMENSION: int = 1536  # text-embedding-ada-002の次元数
     
     # MongoDB設定
-    MONGODB_URI = "mongodb://localhost:27017"
-    MONGODB_DATABASE = "document_store"
-    MONGODB_COLLECTION = "documents"
+    MONGODB_URI: str = "mongodb://localhost:27017"
+    MONGODB_DATABASE: str = "document_store"
+    MONGODB_COLLECTION: str = "documents"
     
     # Neo4j設定
-    NEO4J_URI = "bolt://localhost:7687"
-    NEO4J_USER = "neo4j"
-    NEO4J_PASSWORD = "password"
+    NEO4J_URI: str = "bolt://localhost:7687"
+    NEO4J_USER: str = "neo4j"
+    NEO4J_PASSWORD: str = "password"
     
     # Redis設定
-    REDIS_HOST = "localhost"
-    REDIS_PORT = 6379
-    REDIS_DB = 0
-    REDIS_EXPIRE_TIME = 3600  # 1時間
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_EXPIRE_TIME: int = 3600  # 1時間
     
     # Ollama設定
-    OLLAMA_BASE_URL = "http://localhost:11434"
-    OLLAMA_MODEL = "llama2"
-    OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "llama2"
+    OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"
+    OLLAMA_MAX_INFLIGHT: int = 8  # Ollamaへ同時に送るリクエスト数の上限
     
     # その他設定
-    CHUNK_SIZE = 1000
-    CHUNK_OVERLAP = 200
-    MAX_RESULTS = 10
+    CHUNK_SIZE: int = 1000
+    CHUNK_OVERLAP: int = 200
+    MAX_RESULTS: int = 10
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SystemConfig:
     """システム全体設定"""
     
     # ログ設定
-    LOG_LEVEL = "INFO"
-    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
     # ファイル処理設定
-    SUPPORTED_FILE_TYPES = [".txt", ".pdf", ".docx", ".md"]
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    SUPPORTED_FILE_TYPES: FrozenSet[str] = frozenset({".txt", ".pdf", ".docx", ".md"})
+    MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     
     # 検索設定
-    SIMILARITY_THRESHOLD = 0.7
-    VECTOR_SEARCH_TOP_K = 20
-    RERANK_TOP_K = 5
+    SIMILARITY_THRESHOLD: float = 0.7
+    VECTOR_SEARCH_TOP_K: int = 20
+    RERANK_TOP_K: int = 5
 
 # 環境変数から設定を上書き
 def load_config_from_env():
     """環境変数から設定を読み込み"""
-    config = DatabaseConfig()
+    env = os.environ
+    defaults = DatabaseConfig()
     
-    # 環境変数があれば上書き
-    if os.getenv("MILVUS_HOST"):
-        config.MILVUS_HOST = os.getenv("MILVUS_HOST")
-    if os.getenv("MONGODB_URI"):
-        config.MONGODB_URI = os.getenv("MONGODB_URI")
-    if os.getenv("NEO4J_URI"):
-        config.NEO4J_URI = os.getenv("NEO4J_URI")
-    if os.getenv("REDIS_HOST"):
-        config.REDIS_HOST = os.getenv("REDIS_HOST")
-    if os.getenv("OLLAMA_BASE_URL"):
-        config.OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL")
-    
-    return config
+    # 環境変数があれば上書き（空文字は未設定扱い）
+    return DatabaseConfig(
+        MILVUS_HOST=env.get("MILVUS_HOST") or defaults.MILVUS_HOST,
+        MONGODB_URI=env.get("MONGODB_URI") or defaults.MONGODB_URI,
+        NEO4J_URI=env.get("NEO4J_URI") or defaults.NEO4J_URI,
+        REDIS_HOST=env.get("REDIS_HOST") or defaults.REDIS_HOST,
+        OLLAMA_BASE_URL=env.get("OLLAMA_BASE_URL") or defaults.OLLAMA_BASE_URL,
+        OLLAMA_MAX_INFLIGHT=int(env.get("OLLAMA_MAX_INFLIGHT") or defaults.OLLAMA_MAX_INFLIGHT)
+    )
 
 # グローバル設定インスタンス
 db_config = load_config_from_env()
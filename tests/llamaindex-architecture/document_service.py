@@ -5,7 +5,11 @@ from datetime import datetime
 import os
 from pathlib import Path
 import hashlib
+import heapq
+from operator import attrgetter
 
+import numpy as np
+import orjson
 from llama_index.core import Document as LIDocument
 from llama_index.core.node_parser import SimpleNodeParser
 from llama_index.core.readers import SimpleDirectoryReader
@@ -20,6 +24,19 @@ from config import db_config, sys_config
 
 logger = logging.getLogger(__name__)
 
+# ファイルハッシュ計算時の読み込みサイズ（1MiB）
+HASH_READ_SIZE = 1024 * 1024
+
+# 関係性分析でOllamaへ同時に投げるリクエスト数
+RELATION_ANALYSIS_CONCURRENCY = 8
+
+# チャンク処理パイプラインの1バッチあたりのチャンク数とキューの長さ
+EMBEDDING_BATCH_SIZE = 32
+PIPELINE_QUEUE_SIZE = 4
+
+# クエリエンベディングのキャッシュ有効期限（24時間）
+QUERY_EMBEDDING_CACHE_TTL = 24 * 60 * 60
+
 class DocumentService:
     """ドキュメント統合サービス"""
     
@@ -80,7 +97,8 @@ class DocumentService:
                 self.milvus_repo.disconnect(),
                 self.mongo_repo.disconnect(),
                 self.neo4j_repo.disconnect(),
-                self.redis_repo.disconnect()
+                self.redis_repo.disconnect(),
+                ollama_client.aclose()
             ]
             
             await asyncio.gather(*tasks, return_exceptions=True)
@@ -113,11 +131,11 @@ class DocumentService:
                 logger.error(f"Failed to save document: {file_path}")
                 return None
             
-            # チャンク化とベクトル化
-            await self._process_chunks(document)
-            
-            # グラフノード作成
-            await self.neo4j_repo.create_document_node(document)
+            # チャンク化とベクトル化、グラフノード作成（互いに独立しているので並行実行）
+            await asyncio.gather(
+                self._process_chunks(document),
+                self.neo4j_repo.create_document_node(document)
+            )
             
             # 関係性分析と作成
             await self._analyze_and_create_relations(document)
@@ -146,16 +164,17 @@ class DocumentService:
             if file_ext not in sys_config.SUPPORTED_FILE_TYPES:
                 raise ValueError(f"Unsupported file type: {file_ext}")
             
-            # LlamaIndexでファイル読み込み
+            # LlamaIndexでのファイル読み込みとファイルハッシュ生成
+            # どちらも同期I/Oなので、イベントループをブロックしないようスレッドで並行実行
             reader = SimpleDirectoryReader(input_files=[file_path])
-            li_documents = reader.load_data()
+            li_documents, file_hash = await asyncio.gather(
+                asyncio.to_thread(reader.load_data),
+                asyncio.to_thread(self._generate_file_hash, file_path)
+            )
             
             # Document形式に変換
             documents = []
             for li_doc in li_documents:
-                # ファイルハッシュ生成
-                file_hash = self._generate_file_hash(file_path)
-                
                 document = Document(
                     id=file_hash,
                     title=os.path.basename(file_path),
@@ -180,12 +199,16 @@ class DocumentService:
             return []
     
     def _generate_file_hash(self, file_path: str) -> str:
-        """ファイルハッシュ生成"""
-        hash_md5 = hashlib.md5()
+        """ファイルハッシュ生成（SHA-256）"""
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+ : バッファ管理をC側に任せる
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            
+            hash_sha256 = hashlib.sha256()
+            for chunk in iter(lambda: f.read(HASH_READ_SIZE), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
     
     async def _save_document(self, document: Document) -> str:
         """ドキュメント保存"""
@@ -211,31 +234,53 @@ class DocumentService:
             # LlamaIndexドキュメント作成
             li_document = LIDocument(text=document.content, doc_id=document.id)
             
-            # チャンク化
-            nodes = self.node_parser.get_nodes_from_documents([li_document])
-            
-            # DocumentChunk作成とエンベディング生成
-            chunks = []
-            for i, node in enumerate(nodes):
-                # エンベディング生成
-                embedding = await ollama_client.generate_embedding(node.text)
-                
-                chunk = DocumentChunk(
-                    id=f"{document.id}_chunk_{i}",
-                    document_id=document.id,
-                    content=node.text,
-                    chunk_index=i,
-                    metadata={
-                        "start_char_idx": node.start_char_idx,
-                        "end_char_idx": node.end_char_idx
-                    },
-                    embedding=embedding
-                )
-                chunks.append(chunk)
-            
-            # Milvusに保存
-            if chunks:
-                await self.milvus_repo.insert_vectors(chunks)
+            # チャンク化（トークナイズはCPU処理なのでスレッドで実行）
+            nodes = await asyncio.to_thread(self.node_parser.get_nodes_from_documents, [li_document])
+            
+            # エンベディング生成 → Milvus保存をキューでつないだパイプライン
+            # 次のバッチのエンベディング生成と前のバッチの保存が重なるようにする
+            insert_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            
+            async def embed_stage():
+                try:
+                    for start in range(0, len(nodes), EMBEDDING_BATCH_SIZE):
+                        batch = nodes[start:start + EMBEDDING_BATCH_SIZE]
+                        embeddings = await ollama_client.generate_embeddings_batch([node.text for node in batch])
+                        
+                        # DocumentChunk作成
+                        batch_chunks = []
+                        for i, (node, embedding) in enumerate(zip(batch, embeddings), start):
+                            if embedding is None:
+                                logger.warning(f"Skipping chunk {i} of document {document.id}: embedding failed")
+                                continue
+                            
+                            batch_chunks.append(DocumentChunk(
+                                id=f"{document.id}_chunk_{i}",
+                                document_id=document.id,
+                                content=node.text,
+                                chunk_index=i,
+                                metadata={
+                                    "start_char_idx": node.start_char_idx,
+                                    "end_char_idx": node.end_char_idx
+                                },
+                                embedding=embedding
+                            ))
+                        
+                        if batch_chunks:
+                            await insert_queue.put(batch_chunks)
+                finally:
+                    # 終了通知
+                    await insert_queue.put(None)
+            
+            async def insert_stage() -> List[DocumentChunk]:
+                inserted = []
+                while (batch_chunks := await insert_queue.get()) is not None:
+                    # Milvusに保存
+                    if await self.milvus_repo.insert_vectors(batch_chunks):
+                        inserted.extend(batch_chunks)
+                return inserted
+            
+            _, chunks = await asyncio.gather(embed_stage(), insert_stage())
             
             logger.info(f"Processed {len(chunks)} chunks for document {document.id}")
             
@@ -245,30 +290,41 @@ class DocumentService:
     async def _analyze_and_create_relations(self, document: Document):
         """関係性分析と作成"""
         try:
-            # 既存ドキュメントとの関係性分析
-            existing_docs = await self.mongo_repo.search_documents({"limit": 50})
+            # 既存ドキュメントとの関係性分析（本文は先頭1000文字だけ取得）
+            existing_excerpts = await self.mongo_repo.get_document_excerpts(limit=50, length=1000)
+            source_excerpt = document.content[:1000]  # 最初の1000文字
+            
+            # LLM呼び出しはセマフォで同時実行数を制限して並行実行
+            semaphore = asyncio.Semaphore(RELATION_ANALYSIS_CONCURRENCY)
+            
+            async def analyze(existing_id: str, existing_excerpt: str):
+                async with semaphore:
+                    return existing_id, await ollama_client.analyze_document_relations(
+                        source_excerpt,
+                        existing_excerpt
+                    )
             
-            for existing_doc in existing_docs:
-                if existing_doc.id == document.id:
-                    continue
-                
-                # 関係性分析
-                relation_info = await ollama_client.analyze_document_relations(
-                    document.content[:1000],  # 最初の1000文字
-                    existing_doc.content[:1000]
+            analyses = await asyncio.gather(*[
+                analyze(existing_id, existing_excerpt)
+                for existing_id, existing_excerpt in existing_excerpts.items()
+                if existing_id != document.id
+            ])
+            
+            # 閾値を超えた関係を作成
+            relations = [
+                DocumentRelation(
+                    source_doc_id=document.id,
+                    target_doc_id=existing_id,
+                    relation_type=relation_info["relation_type"],
+                    strength=relation_info["strength"],
+                    metadata={"reason": relation_info["reason"]}
                 )
-                
-                if relation_info and relation_info["strength"] > sys_config.SIMILARITY_THRESHOLD:
-                    # 関係作成
-                    relation = DocumentRelation(
-                        source_doc_id=document.id,
-                        target_doc_id=existing_doc.id,
-                        relation_type=relation_info["relation_type"],
-                        strength=relation_info["strength"],
-                        metadata={"reason": relation_info["reason"]}
-                    )
-                    
-                    await self.neo4j_repo.create_relation(relation)
+                for existing_id, relation_info in analyses
+                if relation_info and relation_info["strength"] > sys_config.SIMILARITY_THRESHOLD
+            ]
+            
+            if relations:
+                await asyncio.gather(*[self.neo4j_repo.create_relation(relation) for relation in relations])
             
         except Exception as e:
             logger.error(f"Failed to analyze relations: {e}")
@@ -289,13 +345,13 @@ class DocumentService:
                 limit = sys_config.VECTOR_SEARCH_TOP_K
             
             # キャッシュキー生成
-            cache_key = f"search:{hashlib.md5(query.encode()).hexdigest()}:{search_type}:{limit}"
+            cache_key = f"search:{hashlib.sha256(query.encode()).hexdigest()}:{search_type}:{limit}"
             
             # キャッシュ確認
-            cached_results = await self.redis_repo.get(cache_key)
+            cached_results = await self.redis_repo.get_bytes(cache_key)
             if cached_results:
                 logger.info("Returning cached search results")
-                return cached_results
+                return [SearchResult.from_dict(result) for result in orjson.loads(cached_results)]
             
             results = []
             
@@ -312,8 +368,13 @@ class DocumentService:
             # 重複除去とスコア統合
             results = await self._merge_search_results(results)
             
-            # 結果をキャッシュ
-            await self.redis_repo.set(cache_key, results, expire_time=300)  # 5分
+            # 結果をキャッシュ（orjsonはdataclassをそのままシリアライズする。失敗しても結果は返す）
+            await self.redis_repo.set_orjson(
+                cache_key,
+                results,
+                expire_time=300,
+                option=orjson.OPT_SERIALIZE_NUMPY
+            )  # 5分
             
             logger.info(f"Found {len(results)} search results for query: {query}")
             return results
@@ -325,19 +386,21 @@ class DocumentService:
     async def _vector_search(self, query: str, limit: int) -> List[SearchResult]:
         """ベクトル検索"""
         try:
-            # クエリのエンベディング生成
-            query_embedding = await ollama_client.generate_embedding(query)
+            # クエリのエンベディング生成（Redisキャッシュ優先）
+            query_embedding = await self._get_query_embedding(query)
             if not query_embedding:
                 return []
             
             # Milvus検索
             results = await self.milvus_repo.search_vectors(query_embedding, limit)
             
-            # ドキュメントタイトル補完
+            # ドキュメントタイトル補完（ヒット全件分を1クエリで取得）
+            document_ids = list({result.document_id for result in results})
+            titles = await self.mongo_repo.get_document_titles(document_ids) if document_ids else {}
             for result in results:
-                document = await self.mongo_repo.get_document(result.document_id)
-                if document:
-                    result.document_title = document.title
+                title = titles.get(result.document_id)
+                if title:
+                    result.document_title = title
             
             return results
             
@@ -345,6 +408,23 @@ class DocumentService:
             logger.error(f"Failed to perform vector search: {e}")
             return []
     
+    async def _get_query_embedding(self, query: str) -> Optional[List[float]]:
+        """クエリエンベディング取得（float32のバイト列としてRedisにキャッシュ）"""
+        cache_key = f"emb:{hashlib.sha256(query.encode()).hexdigest()}"
+        
+        cached = await self.redis_repo.get_bytes(cache_key)
+        if cached:
+            return np.frombuffer(cached, dtype=np.float32).tolist()
+        
+        embedding = await ollama_client.generate_embedding(query)
+        if embedding:
+            await self.redis_repo.set_bytes(
+                cache_key,
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+                expire_time=QUERY_EMBEDDING_CACHE_TTL
+            )
+        return embedding
+    
     async def _text_search(self, query: str, filters: Dict[str, Any], limit: int) -> List[SearchResult]:
         """テキスト検索"""
         try:
@@ -376,23 +456,15 @@ class DocumentService:
     async def _merge_search_results(self, results: List[SearchResult]) -> List[SearchResult]:
         """検索結果マージ"""
         try:
-            # ドキュメントIDでグループ化
-            doc_results = {}
+            # ドキュメントごとに最高スコアの結果だけを残す（1パス）
+            best_results: Dict[str, SearchResult] = {}
             for result in results:
-                if result.document_id not in doc_results:
-                    doc_results[result.document_id] = []
-                doc_results[result.document_id].append(result)
-            
-            # 各ドキュメントの最高スコアを採用
-            merged_results = []
-            for doc_id, doc_result_list in doc_results.items():
-                best_result = max(doc_result_list, key=lambda x: x.score)
-                merged_results.append(best_result)
-            
-            # スコア順ソート
-            merged_results.sort(key=lambda x: x.score, reverse=True)
+                best = best_results.get(result.document_id)
+                if best is None or result.score > best.score:
+                    best_results[result.document_id] = result
             
-            return merged_results[:sys_config.RERANK_TOP_K]
+            # 上位K件だけをヒープで取り出す（全件ソートしない）
+            return heapq.nlargest(sys_config.RERANK_TOP_K, best_results.values(), key=attrgetter("score"))
             
         except Exception as e:
             logger.error(f"Failed to merge search results: {e}")
@@ -403,26 +475,19 @@ class DocumentService:
         try:
             # キャッシュ確認
             cache_key = f"doc:{document_id}"
-            cached_doc = await self.redis_repo.get(cache_key)
+            cached_doc = await self.redis_repo.get_bytes(cache_key)
             if cached_doc:
-                return Document(**cached_doc)
+                doc_dict = orjson.loads(cached_doc)
+                doc_dict["created_at"] = datetime.fromisoformat(doc_dict["created_at"])
+                doc_dict["updated_at"] = datetime.fromisoformat(doc_dict["updated_at"])
+                return Document(**doc_dict)
             
             # MongoDB取得
             document = await self.mongo_repo.get_document(document_id)
             if document:
-                # キャッシュ保存
-                doc_dict = {
-                    "id": document.id,
-                    "title": document.title,
-                    "content": document.content,
-                    "file_path": document.file_path,
-                    "file_type": document.file_type,
-                    "metadata": document.metadata,
-                    "created_at": document.created_at.isoformat(),
-                    "updated_at": document.updated_at.isoformat(),
-                    "tags": document.tags
-                }
-                await self.redis_repo.set(cache_key, doc_dict)
+                # キャッシュ保存（orjsonはdataclassとdatetimeをそのままシリアライズできる。
+                # 失敗しても取得済みのドキュメントは返す）
+                await self.redis_repo.set_orjson(cache_key, document)
             
             return document
             
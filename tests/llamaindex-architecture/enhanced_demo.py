@@ -1,118 +1,46 @@
 import asyncio
+import dbm
+import hashlib
+import itertools
 import logging
 import sys
 from pathlib import Path
+from typing import Any, Dict, Tuple
 
 # プロジェクトルートをPythonパスに追加
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+import numpy as np
+
 from enhanced_document_service import EnhancedDocumentService
+from ollama_client import ollama_client
+from config import db_config
 
 # ログ設定
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    style='%'
 )
+# フォーマットで使わないスレッド・プロセス情報はレコードごとに収集しない
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.raiseExceptions = False
 logger = logging.getLogger(__name__)
 
-async def main():
-    """拡張機能デモ"""
-    service = None
-    
-    try:
-        logger.info("=== Enhanced LlamaIndex Multi-Database Architecture Demo ===")
-        logger.info("Initializing enhanced document service...")
-        
-        service = EnhancedDocumentService()
-        success = await service.initialize()
-        
-        if not success:
-            logger.error("Failed to initialize enhanced document service")
-            return
-        
-        logger.info("✅ Enhanced document service initialized successfully")
-        
-        # 拡張システム統計表示
-        await display_enhanced_stats(service)
-        
-        # 拡張サンプルドキュメント作成
-        await create_enhanced_sample_documents(service)
-        
-        # 知的検索デモ
-        await intelligent_search_demo(service)
-        
-        # 自然言語クエリデモ
-        await natural_language_query_demo(service)
-        
-        # パフォーマンス統計
-        await performance_analysis_demo(service)
-        
-        # 最終統計表示
-        await display_enhanced_stats(service)
-        
-    except Exception as e:
-        logger.error(f"Enhanced demo failed: {e}")
-    
-    finally:
-        if service:
-            await service.shutdown()
-            logger.info("🔌 Enhanced document service shutdown completed")
+# デモで同時に実行する検索・質問の数
+DEMO_QUERY_CONCURRENCY = 4
 
-async def display_enhanced_stats(service: EnhancedDocumentService):
-    """拡張システム統計表示"""
-    try:
-        logger.info("\n📊 Enhanced System Statistics:")
-        stats = await service.get_enhanced_system_stats()
-        
-        # 基本統計
-        if "mongodb" in stats and stats["mongodb"]:
-            mongo_stats = stats["mongodb"]
-            logger.info(f"  📄 MongoDB: {mongo_stats.get('total_documents', 0)} documents")
-        
-        if "milvus" in stats and stats["milvus"]:
-            milvus_stats = stats["milvus"]
-            logger.info(f"  🔍 Milvus: Vector store ready - {milvus_stats.get('status', 'unknown')}")
-        
-        # Neo4j拡張統計
-        if "neo4j_enhanced" in stats and stats["neo4j_enhanced"]:
-            neo4j_stats = stats["neo4j_enhanced"]
-            logger.info(f"  🕸️  Neo4j Enhanced:")
-            logger.info(f"    - Documents: {neo4j_stats.get('total_documents', 0)}")
-            logger.info(f"    - Tags: {neo4j_stats.get('total_tags', 0)}")
-            logger.info(f"    - Relationships: {neo4j_stats.get('total_relationships', 0)}")
-        
-        # Ollama性能統計
-        if "ollama_performance" in stats and stats["ollama_performance"]:
-            ollama_stats = stats["ollama_performance"]
-            logger.info(f"  🤖 Ollama Performance:")
-            logger.info(f"    - Embeddings generated: {ollama_stats.get('embeddings_generated', 0)}")
-            logger.info(f"    - Cache hit ratio: {ollama_stats.get('cache_hit_ratio', 0):.2%}")
-            logger.info(f"    - Cache size: {ollama_stats.get('cache_size', 0)}")
-        
-        # LlamaIndex状態
-        if "llamaindex_status" in stats and stats["llamaindex_status"]:
-            li_stats = stats["llamaindex_status"]
-            logger.info(f"  🦙 LlamaIndex Status:")
-            logger.info(f"    - Vector Index: {'✅' if li_stats.get('vector_index_ready') else '❌'}")
-            logger.info(f"    - Query Engine: {'✅' if li_stats.get('query_engine_ready') else '❌'}")
-            logger.info(f"    - Retriever: {'✅' if li_stats.get('retriever_ready') else '❌'}")
-        
-        logger.info("")
-        
-    except Exception as e:
-        logger.error(f"Failed to display enhanced stats: {e}")
+# 取り込み済みサンプルの記録（コンテンツハッシュ+エンベディングモデル -> ドキュメントID）
+SAMPLE_INGEST_CACHE_PATH = str(project_root / ".sample_ingest_cache")
 
-async def create_enhanced_sample_documents(service: EnhancedDocumentService):
-    """拡張サンプルドキュメント作成"""
-    try:
-        logger.info("📝 Creating enhanced sample documents...")
-        
-        # より詳細なサンプルファイル
-        enhanced_sample_files = [
-            {
-                "filename": "advanced_ai_research.txt",
-                "content": """最新の人工知能研究動向
+# 拡張デモ用サンプルドキュメント
+ENHANCED_SAMPLE_FILES: Tuple[Dict[str, Any], ...] = (
+    {
+        "filename": "advanced_ai_research.txt",
+        "content": """最新の人工知能研究動向
 
 近年の人工知能（AI）研究は驚異的な進歩を遂げています。特に大規模言語モデル（LLM）の発展により、自然言語処理、機械翻訳、文書生成、コード生成などの分野で革新的な成果が生まれています。
 
@@ -137,16 +65,16 @@ ChatGPTで用いられたRLHF（Reinforcement Learning from Human Feedback）の
 - AI倫理とガバナンスの確立
 
 これらの技術は、医療、教育、エンターテインメント、製造業など、あらゆる分野での応用が期待されています。""",
-                "metadata": {
-                    "category": "research", 
-                    "topic": "artificial_intelligence",
-                    "research_level": "advanced",
-                    "publication_year": 2024
-                }
-            },
-            {
-                "filename": "quantum_computing_basics.txt",
-                "content": """量子コンピューティング入門
+        "metadata": {
+            "category": "research", 
+            "topic": "artificial_intelligence",
+            "research_level": "advanced",
+            "publication_year": 2024
+        }
+    },
+    {
+        "filename": "quantum_computing_basics.txt",
+        "content": """量子コンピューティング入門
 
 量子コンピューティングは、量子力学の原理を利用した革新的な計算技術です。従来のコンピュータとは根本的に異なる原理で動作し、特定の問題に対して指数的な高速化を実現できる可能性があります。
 
@@ -179,16 +107,16 @@ ChatGPTで用いられたRLHF（Reinforcement Learning from Human Feedback）の
 - 量子ソフトウェア開発
 
 IBM、Google、Microsoft、Amazonなどの企業が量子コンピュータの実用化に向けて競争しており、NISQ（Noisy Intermediate-Scale Quantum）時代から本格的な量子優位性の実現へと進んでいます。""",
-                "metadata": {
-                    "category": "technology", 
-                    "topic": "quantum_computing",
-                    "difficulty": "intermediate",
-                    "target_audience": "engineers"
-                }
-            },
-            {
-                "filename": "sustainable_technology.txt",
-                "content": """持続可能な技術革新
+        "metadata": {
+            "category": "technology", 
+            "topic": "quantum_computing",
+            "difficulty": "intermediate",
+            "target_audience": "engineers"
+        }
+    },
+    {
+        "filename": "sustainable_technology.txt",
+        "content": """持続可能な技術革新
 
 気候変動とエネルギー危機への対応として、持続可能な技術革新が急務となっています。テクノロジー業界も環境負荷を削減し、循環型社会の実現に向けた取り組みを加速させています。
 
@@ -237,111 +165,373 @@ IBM、Google、Microsoft、Amazonなどの企業が量子コンピュータの
 - 国際協力の推進
 
 持続可能な技術革新は、環境保護と経済成長の両立を可能にし、次世代への責任を果たす鍵となります。技術者、企業、政府が連携して、より良い未来を築いていく必要があります。""",
-                "metadata": {
-                    "category": "sustainability", 
-                    "topic": "green_technology",
-                    "impact": "global",
-                    "urgency": "high"
-                }
-            }
-        ]
-        
-        # ファイル作成と拡張処理
-        for file_info in enhanced_sample_files:
-            file_path = project_root / file_info["filename"]
-            
-            # ファイル作成
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(file_info["content"])
-            
-            # 拡張ドキュメント処理
-            document_id = await service.process_file_enhanced(
-                str(file_path), 
-                file_info["metadata"],
-                extract_entities=True,
-                analyze_sentiment=True
+        "metadata": {
+            "category": "sustainability", 
+            "topic": "green_technology",
+            "impact": "global",
+            "urgency": "high"
+        }
+    }
+)
+
+# サンプル内容のUTF-8バイト列（ハッシュ計算のたびにエンコードしない）
+ENCODED_SAMPLE_CONTENTS: Dict[str, bytes] = {
+    file_info["filename"]: file_info["content"].encode("utf-8")
+    for file_info in ENHANCED_SAMPLE_FILES
+}
+
+# 知的検索デモのクエリと自然言語クエリデモの質問
+DEMO_SEARCH_QUERIES: Tuple[str, ...] = (
+    "量子コンピュータの基本原理とアルゴリズム",
+    "AI研究における最新のトランスフォーマー技術",
+    "持続可能なエネルギー技術の発展",
+    "機械学習と強化学習の融合",
+    "環境技術とデジタル革新"
+)
+DEMO_NL_QUESTIONS: Tuple[str, ...] = (
+    "AIと量子コンピューティングの関係について教えてください",
+    "持続可能な技術にはどのような種類がありますか？",
+    "機械学習の最新トレンドは何ですか？"
+)
+
+
+def _sample_cache_key(content_bytes: bytes) -> str:
+    content_hash = hashlib.sha256(content_bytes).hexdigest()
+    return f"{content_hash}:ollama:{db_config.OLLAMA_EMBEDDING_MODEL}"
+
+
+def lookup_ingested_samples(keys):
+    """取り込み済みサンプルのドキュメントIDを取得"""
+    with dbm.open(SAMPLE_INGEST_CACHE_PATH, "c") as cache:
+        return {key: cache[key].decode() for key in keys if key in cache}
+
+
+def record_ingested_samples(entries):
+    """取り込み済みサンプルを記録"""
+    with dbm.open(SAMPLE_INGEST_CACHE_PATH, "c") as cache:
+        for key, document_id in entries.items():
+            cache[key] = document_id
+
+
+class _Truncated:
+    """ログ出力時にだけ先頭n文字へ切り詰める文字列ラッパー"""
+    
+    __slots__ = ("text", "length")
+    
+    def __init__(self, text: str, length: int):
+        self.text = text
+        self.length = length
+    
+    def __str__(self) -> str:
+        return self.text[:self.length] + "..."
+
+
+class _EntityNames:
+    """ログ出力時にだけ先頭n件のエンティティ名を連結するラッパー"""
+    
+    __slots__ = ("entities", "limit")
+    
+    def __init__(self, entities, limit: int):
+        self.entities = entities
+        self.limit = limit
+    
+    def __str__(self) -> str:
+        return ", ".join(e.get("name", "") for e in itertools.islice(self.entities, self.limit))
+
+
+class SemanticQueryCache:
+    """意味的にほぼ同じクエリの結果を再利用するキャッシュ
+
+    正規化したクエリ文字列の完全一致を先に確認し、外れた場合はクエリの
+    エンベディングと過去のクエリとのコサイン類似度で判定する。
+    満杯になったら参照回数が最も少ないエントリを置き換える（LFU）。
+    """
+    
+    def __init__(self, similarity_threshold: float = 0.95, max_entries: int = 256):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._slots = {}        # 正規化クエリ -> スロット番号
+        self._queries = []      # スロット番号 -> 正規化クエリ
+        self._values = []
+        self._hits = []
+        self._vectors = None    # (max_entries, dim) の正規化済みエンベディング
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.split()).lower()
+    
+    async def _embed(self, query: str):
+        embedding = await ollama_client.generate_embedding(query)
+        if not embedding:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def _lookup(self, vector):
+        if vector is None or not self._queries:
+            return None
+        similarities = self._vectors[:len(self._queries)] @ vector
+        best = int(np.argmax(similarities))
+        return best if similarities[best] >= self.similarity_threshold else None
+    
+    def _store(self, key: str, vector, value):
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        
+        slot = self._slots.get(key)
+        if slot is not None:
+            # 並行実行で同じクエリが同時にミスした場合は既存スロットを上書き
+            self._values[slot] = value
+        elif len(self._queries) < self.max_entries:
+            slot = len(self._queries)
+            self._queries.append(key)
+            self._values.append(value)
+            self._hits.append(0)
+        else:
+            # 参照回数が最も少ないエントリを置き換え
+            slot = int(np.argmin(self._hits))
+            del self._slots[self._queries[slot]]
+            self._queries[slot] = key
+            self._values[slot] = value
+            self._hits[slot] = 0
+        
+        self._vectors[slot] = vector
+        self._slots[key] = slot
+    
+    async def get_or_compute(self, query: str, compute):
+        """キャッシュ済みの結果を返し、なければ compute() を実行して保存"""
+        key = self.normalize(query)
+        
+        slot = self._slots.get(key)
+        vector = None
+        if slot is None:
+            vector = await self._embed(key)
+            slot = self._lookup(vector)
+        
+        if slot is not None:
+            self._hits[slot] += 1
+            return self._values[slot]
+        
+        value = await compute()
+        if value and vector is not None:
+            self._store(key, vector, value)
+        return value
+
+
+# 知的検索・自然言語クエリそれぞれのクエリキャッシュ
+search_cache = SemanticQueryCache()
+nl_query_cache = SemanticQueryCache()
+
+async def main():
+    """拡張機能デモ"""
+    service = None
+    
+    try:
+        logger.info("=== Enhanced LlamaIndex Multi-Database Architecture Demo ===")
+        logger.info("Initializing enhanced document service...")
+        
+        service = EnhancedDocumentService()
+        success = await service.initialize()
+        
+        if not success:
+            logger.error("Failed to initialize enhanced document service")
+            return
+        
+        logger.info("✅ Enhanced document service initialized successfully")
+        
+        # 拡張システム統計表示
+        await display_enhanced_stats(service)
+        
+        # 拡張サンプルドキュメント作成と並行して、デモで使う全クエリのエンベディングを
+        # 1リクエストでまとめて生成しておく（セマンティックキャッシュは正規化したクエリ、
+        # リランキングは元のクエリでエンベディングを引くので両方を用意する）
+        demo_queries = DEMO_SEARCH_QUERIES + DEMO_NL_QUESTIONS
+        await asyncio.gather(
+            create_enhanced_sample_documents(service),
+            ollama_client.prime_embeddings(
+                [*demo_queries, *(SemanticQueryCache.normalize(query) for query in demo_queries)]
             )
-            
+        )
+        
+        # 知的検索デモと自然言語クエリデモは互いに独立しているので並行実行
+        # （Ollamaへの同時リクエスト数はollama_client側で制限される）
+        search_task = asyncio.create_task(intelligent_search_demo(service))
+        nl_task = asyncio.create_task(natural_language_query_demo(service))
+        await asyncio.gather(search_task, nl_task)
+        
+        # パフォーマンス統計（検索デモの結果を反映させるため完了後に実行）
+        await performance_analysis_demo(service)
+        
+        # 最終統計表示
+        await display_enhanced_stats(service)
+        
+    except Exception as e:
+        logger.error("Enhanced demo failed: %s", e)
+    
+    finally:
+        if service:
+            await service.shutdown()
+            logger.info("🔌 Enhanced document service shutdown completed")
+
+async def display_enhanced_stats(service: EnhancedDocumentService):
+    """拡張システム統計表示"""
+    # INFOが出力されない設定なら統計の取得も整形も行わない
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    try:
+        logger.info("\n📊 Enhanced System Statistics:")
+        stats = await service.get_enhanced_system_stats()
+        
+        # 基本統計
+        if mongo_stats := stats.get("mongodb"):
+            logger.info("  📄 MongoDB: %d documents", mongo_stats.get("total_documents", 0))
+        
+        if milvus_stats := stats.get("milvus"):
+            logger.info("  🔍 Milvus: Vector store ready - %s", milvus_stats.get("status", "unknown"))
+        
+        # Neo4j拡張統計
+        if neo4j_stats := stats.get("neo4j_enhanced"):
+            logger.info("  🕸️  Neo4j Enhanced:")
+            logger.info("    - Documents: %d", neo4j_stats.get("total_documents", 0))
+            logger.info("    - Tags: %d", neo4j_stats.get("total_tags", 0))
+            logger.info("    - Relationships: %d", neo4j_stats.get("total_relationships", 0))
+        
+        # Ollama性能統計
+        if ollama_stats := stats.get("ollama_performance"):
+            logger.info("  🤖 Ollama Performance:")
+            logger.info("    - Embeddings generated: %d", ollama_stats.get("embeddings_generated", 0))
+            logger.info("    - Cache hit ratio: %.2f%%", ollama_stats.get("cache_hit_ratio", 0) * 100)
+            logger.info("    - Cache size: %d", ollama_stats.get("cache_size", 0))
+        
+        # LlamaIndex状態
+        if li_stats := stats.get("llamaindex_status"):
+            logger.info("  🦙 LlamaIndex Status:")
+            logger.info("    - Vector Index: %s", "✅" if li_stats.get("vector_index_ready") else "❌")
+            logger.info("    - Query Engine: %s", "✅" if li_stats.get("query_engine_ready") else "❌")
+            logger.info("    - Retriever: %s", "✅" if li_stats.get("retriever_ready") else "❌")
+        
+        logger.info("")
+        
+    except Exception as e:
+        logger.error("Failed to display enhanced stats: %s", e)
+
+async def create_enhanced_sample_documents(service: EnhancedDocumentService):
+    """拡張サンプルドキュメント作成"""
+    try:
+        logger.info("📝 Creating enhanced sample documents...")
+        
+        # 内容とエンベディングモデルが変わっていないサンプルは再処理しない
+        cache_keys = [_sample_cache_key(ENCODED_SAMPLE_CONTENTS[file_info["filename"]]) for file_info in ENHANCED_SAMPLE_FILES]
+        ingested = lookup_ingested_samples(cache_keys)
+        
+        async def is_ingested(cache_key):
+            document_id = ingested.get(cache_key)
+            return bool(document_id) and await service.mongo_repo.get_document(document_id) is not None
+        
+        already = await asyncio.gather(*[is_ingested(cache_key) for cache_key in cache_keys])
+        pending = [i for i, done in enumerate(already) if not done]
+        
+        # 未取り込みのサンプルはまとめて処理（全チャンクのエンベディングを1リクエストで生成）
+        processed = await service.process_contents_batch(
+            [ENHANCED_SAMPLE_FILES[i] for i in pending],
+            extract_entities=True,
+            analyze_sentiment=True
+        )
+        
+        results = [ingested.get(cache_key) if done else None for cache_key, done in zip(cache_keys, already)]
+        for i, document_id in zip(pending, processed):
+            results[i] = document_id
+        
+        for file_info, done in zip(ENHANCED_SAMPLE_FILES, already):
+            if done:
+                logger.info("  ♻️  Already ingested: %s", file_info["filename"])
+        
+        newly_ingested = {}
+        for file_info, cache_key, document_id in zip(ENHANCED_SAMPLE_FILES, cache_keys, results):
             if document_id:
-                logger.info(f"  ✅ Enhanced: {file_info['filename']} (ID: {document_id[:8]}...)")
+                logger.info("  ✅ Enhanced: %s (ID: %.8s...)", file_info["filename"], document_id)
+                newly_ingested[cache_key] = document_id
             else:
-                logger.error(f"  ❌ Failed: {file_info['filename']}")
-            
-            # ファイル削除（クリーンアップ）
-            if file_path.exists():
-                file_path.unlink()
+                logger.error("  ❌ Failed: %s", file_info["filename"])
+        
+        if newly_ingested:
+            record_ingested_samples(newly_ingested)
         
         logger.info("📝 Enhanced sample documents created successfully\n")
         
     except Exception as e:
-        logger.error(f"Failed to create enhanced sample documents: {e}")
+        logger.error("Failed to create enhanced sample documents: %s", e)
 
 async def intelligent_search_demo(service: EnhancedDocumentService):
     """知的検索デモ"""
     try:
         logger.info("🧠 Intelligent Search Demo:")
         
-        enhanced_queries = [
-            "量子コンピュータの基本原理とアルゴリズム",
-            "AI研究における最新のトランスフォーマー技術",
-            "持続可能なエネルギー技術の発展",
-            "機械学習と強化学習の融合",
-            "環境技術とデジタル革新"
-        ]
-        
-        for query in enhanced_queries:
-            logger.info(f"\n  🔍 Intelligent Query: '{query}'")
-            
-            # 知的検索実行
-            results = await service.intelligent_search(
-                query, 
-                search_type="hybrid", 
-                include_metadata=True,
-                rerank=True,
-                limit=3
-            )
+        # 検索は並行実行し、完了したものから順に表示する
+        semaphore = asyncio.Semaphore(DEMO_QUERY_CONCURRENCY)
+        
+        async def run_query(query):
+            async with semaphore:
+                # 知的検索実行（意味的に同じクエリはキャッシュから返す）
+                return query, await search_cache.get_or_compute(
+                    query,
+                    lambda: service.intelligent_search(
+                        query, 
+                        search_type="hybrid", 
+                        include_metadata=True,
+                        rerank=True,
+                        limit=3
+                    )
+                )
+        
+        for completed in asyncio.as_completed([run_query(query) for query in DEMO_SEARCH_QUERIES]):
+            query, results = await completed
+            logger.info("\n  🔍 Intelligent Query: '%s'", query)
             
             if results:
                 for i, result in enumerate(results, 1):
-                    logger.info(f"    {i}. {result.document_title} (Score: {result.score:.3f})")
-                    logger.info(f"       {result.content[:120]}...")
-                    if result.metadata.get("entities"):
-                        entities = result.metadata["entities"][:2]  # 最初の2つのエンティティ
-                        entity_names = [e.get("name", "") for e in entities]
-                        logger.info(f"       Entities: {', '.join(entity_names)}")
+                    logger.info("    %d. %s (Score: %.3f)", i, result.document_title, result.score)
+                    logger.info("       %s", _Truncated(result.content, 120))
+                    if entities := result.metadata.get("entities"):
+                        # 最初の2つのエンティティ
+                        logger.info("       Entities: %s", _EntityNames(entities, 2))
             else:
                 logger.info("    No results found")
         
         logger.info("\n🧠 Intelligent search demo completed\n")
         
     except Exception as e:
-        logger.error(f"Intelligent search demo failed: {e}")
+        logger.error("Intelligent search demo failed: %s", e)
 
 async def natural_language_query_demo(service: EnhancedDocumentService):
     """自然言語クエリデモ"""
     try:
         logger.info("💬 Natural Language Query Demo:")
         
-        nl_questions = [
-            "AIと量子コンピューティングの関係について教えてください",
-            "持続可能な技術にはどのような種類がありますか？",
-            "機械学習の最新トレンドは何ですか？"
-        ]
+        # 質問は並行実行し、回答が得られたものから順に表示する
+        semaphore = asyncio.Semaphore(DEMO_QUERY_CONCURRENCY)
         
-        for question in nl_questions:
-            logger.info(f"\n  ❓ Question: '{question}'")
-            
-            # 自然言語クエリ実行
-            response = await service.natural_language_query(question)
-            
-            logger.info(f"  💡 Answer: {response.get('answer', 'No answer available')[:200]}...")
-            logger.info(f"  📊 Confidence: {response.get('confidence', 0.0):.2%}")
-            logger.info(f"  📚 Sources: {len(response.get('sources', []))} documents")
+        async def run_question(question):
+            async with semaphore:
+                # 自然言語クエリ実行（意味的に同じ質問はキャッシュから返す）
+                return question, await nl_query_cache.get_or_compute(
+                    question,
+                    lambda: service.natural_language_query(question)
+                )
+        
+        for completed in asyncio.as_completed([run_question(question) for question in DEMO_NL_QUESTIONS]):
+            question, response = await completed
+            logger.info("\n  ❓ Question: '%s'", question)
+            logger.info("  💡 Answer: %s", _Truncated(response.get("answer", "No answer available"), 200))
+            logger.info("  📊 Confidence: %.2f%%", response.get("confidence", 0.0) * 100)
+            logger.info("  📚 Sources: %d documents", len(response.get("sources", [])))
         
         logger.info("\n💬 Natural language query demo completed\n")
         
     except Exception as e:
-        logger.error(f"Natural language query demo failed: {e}")
+        logger.error("Natural language query demo failed: %s", e)
 
 async def performance_analysis_demo(service: EnhancedDocumentService):
     """パフォーマンス分析デモ"""
@@ -349,15 +539,21 @@ async def performance_analysis_demo(service: EnhancedDocumentService):
         logger.info("⚡ Performance Analysis Demo:")
         
         # Ollama統計取得
-        from ollama_client import ollama_client
         perf_stats = await ollama_client.get_performance_stats()
         
-        logger.info(f"  🤖 Ollama Performance:")
-        logger.info(f"    - Total embeddings: {perf_stats.get('embeddings_generated', 0)}")
-        logger.info(f"    - Total text generations: {perf_stats.get('text_generated', 0)}")
-        logger.info(f"    - Cache hits: {perf_stats.get('cache_hits', 0)}")
-        logger.info(f"    - Cache misses: {perf_stats.get('cache_misses', 0)}")
-        logger.info(f"    - Hit ratio: {perf_stats.get('cache_hit_ratio', 0):.2%}")
+        logger.info("  🤖 Ollama Performance:")
+        logger.info("    - Total embeddings: %d", perf_stats.get("embeddings_generated", 0))
+        logger.info("    - Total text generations: %d", perf_stats.get("text_generated", 0))
+        logger.info("    - Cache hits: %d", perf_stats.get("cache_hits", 0))
+        logger.info("    - Cache misses: %d", perf_stats.get("cache_misses", 0))
+        logger.info("    - Hit ratio: %.2f%%", perf_stats.get("cache_hit_ratio", 0) * 100)
+        # 並行実行フェーズ中に記録されたピーク値（この時点の実行中数は常に 0）
+        logger.info(
+            "    - Peak in-flight requests: %d/%d (peak queued: %d)",
+            perf_stats.get("peak_inflight_requests", 0),
+            perf_stats.get("max_inflight", 0),
+            perf_stats.get("peak_queued_requests", 0)
+        )
         
         # キャッシュクリアテスト
         logger.info("\n  🧹 Testing cache clear...")
@@ -367,13 +563,27 @@ async def performance_analysis_demo(service: EnhancedDocumentService):
         logger.info("\n⚡ Performance analysis completed\n")
         
     except Exception as e:
-        logger.error(f"Performance analysis failed: {e}")
+        logger.error("Performance analysis failed: %s", e)
+
+def run_with_best_loop(coro):
+    """uvloopがインストールされていればそのイベントループで実行"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    
+    uvloop.install()
+    return asyncio.run(coro)
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        run_with_best_loop(main())
     except KeyboardInterrupt:
         logger.info("\n👋 Enhanced demo interrupted by user")
     except Exception as e:
-        logger.error(f"Enhanced demo failed: {e}")
+        logger.error("Enhanced demo failed: %s", e)
         sys.exit(1)
\ No newline at end of file
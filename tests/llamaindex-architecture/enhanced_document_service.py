@@ -5,7 +5,12 @@ from datetime import datetime
 import os
 from pathlib import Path
 import hashlib
+import heapq
+import time
+from operator import attrgetter
 
+import numpy as np
+import orjson
 from llama_index.core import VectorStoreIndex, Document as LIDocument, StorageContext
 from llama_index.core.node_parser import SimpleNodeParser, SentenceSplitter
 from llama_index.core.readers import SimpleDirectoryReader
@@ -26,6 +31,15 @@ from config import db_config, sys_config
 
 logger = logging.getLogger(__name__)
 
+# システム統計を再利用する期間（秒）
+SYSTEM_STATS_CACHE_TTL = 5.0
+
+# /api/embed の1リクエストで送るチャンク数
+EMBED_REQUEST_BATCH_SIZE = 32
+
+# プロンプト・参照テキストのエンベディングのキャッシュ有効期限（1時間）
+QUERY_EMBEDDING_CACHE_TTL = 60 * 60
+
 class EnhancedDocumentService:
     """LlamaIndex統合強化ドキュメントサービス"""
     
@@ -48,6 +62,9 @@ class EnhancedDocumentService:
         self.query_engine = None
         self.retriever = None
         
+        # システム統計キャッシュ（取得時刻, 統計）
+        self._system_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
         self.initialized = False
     
     async def initialize(self) -> bool:
@@ -154,37 +171,184 @@ class EnhancedDocumentService:
             
             document = documents[0]
             
-            # メタデータ設定
-            if metadata:
-                document.metadata.update(metadata)
+            document_id = await self._process_document_enhanced(
+                document, metadata, extract_entities, analyze_sentiment
+            )
+            if document_id:
+                logger.info(f"Successfully processed file with enhancements: {file_path}")
+            return document_id
             
-            # 拡張メタデータ生成
-            enhanced_metadata = await self._generate_enhanced_metadata(
-                document, extract_entities, analyze_sentiment
+        except Exception as e:
+            logger.error(f"Failed to process file {file_path}: {e}")
+            return None
+    
+    async def process_content_enhanced(
+        self,
+        content: str,
+        filename: str,
+        metadata: Dict[str, Any] = None,
+        extract_entities: bool = True,
+        analyze_sentiment: bool = True
+    ) -> Optional[str]:
+        """拡張テキスト処理（ファイルを経由せずメモリ上の内容を直接取り込む）"""
+        try:
+            if not self.initialized:
+                await self.initialize()
+            
+            document = self._build_content_document(content, filename)
+            
+            document_id = await self._process_document_enhanced(
+                document, metadata, extract_entities, analyze_sentiment
             )
-            document.metadata.update(enhanced_metadata)
+            if document_id:
+                logger.info(f"Successfully processed content with enhancements: {filename}")
+            return document_id
             
-            # ドキュメント保存
-            document_id = await self._save_document(document)
-            if not document_id:
-                logger.error(f"Failed to save document: {file_path}")
-                return None
+        except Exception as e:
+            logger.error(f"Failed to process content {filename}: {e}")
+            return None
+    
+    async def process_contents_batch(
+        self,
+        items: List[Dict[str, Any]],
+        extract_entities: bool = True,
+        analyze_sentiment: bool = True
+    ) -> List[Optional[str]]:
+        """複数テキストの一括拡張処理
+
+        items は content / filename / metadata を持つ辞書のリスト。
+        全ドキュメントのチャンクを1回の /api/embed リクエストでエンベディングし、
+        Milvusにもまとめて挿入する。戻り値は items と同じ順序のドキュメントID。
+        """
+        if not items:
+            return []
+        
+        try:
+            if not self.initialized:
+                await self.initialize()
             
-            # 拡張チャンク処理
-            await self._process_chunks_enhanced(document)
+            documents = [
+                self._build_content_document(item["content"], item["filename"])
+                for item in items
+            ]
             
-            # 拡張グラフノード作成
-            await self.neo4j_repo.create_document_node(document)
+            # メタデータ生成と保存はドキュメントごとに並行実行
+            document_ids = await asyncio.gather(*[
+                self._prepare_document_enhanced(
+                    document, item.get("metadata"), extract_entities, analyze_sentiment
+                )
+                for document, item in zip(documents, items)
+            ])
+            saved = [document for document, document_id in zip(documents, document_ids) if document_id]
+            if not saved:
+                return list(document_ids)
+            
+            # 全ドキュメントをチャンク化し、エンベディングは1リクエストで生成
+            nodes_per_document = await asyncio.gather(*[self._split_document(document) for document in saved])
+            texts = [node.text for nodes in nodes_per_document for node in nodes]
+            embeddings = await ollama_client.embed_batch(texts, batch_size=EMBED_REQUEST_BATCH_SIZE)
+            
+            # ドキュメントごとに切り分けてチャンクを作成し、まとめて保存
+            all_chunks = []
+            all_nodes = []
+            offset = 0
+            for document, nodes in zip(saved, nodes_per_document):
+                chunks, enhanced_nodes = self._build_enhanced_chunks(
+                    document, nodes, embeddings[offset:offset + len(nodes)]
+                )
+                offset += len(nodes)
+                all_chunks.extend(chunks)
+                all_nodes.extend(enhanced_nodes)
+            await self._store_enhanced_chunks(all_chunks, all_nodes)
+            logger.info(f"Processed {len(all_chunks)} enhanced chunks for {len(saved)} documents")
             
-            # 関係性分析と作成
-            await self._analyze_and_create_relations_enhanced(document)
+            await asyncio.gather(*[self._finalize_document_enhanced(document) for document in saved])
             
-            logger.info(f"Successfully processed file with enhancements: {file_path}")
-            return document_id
+            return list(document_ids)
             
         except Exception as e:
-            logger.error(f"Failed to process file {file_path}: {e}")
+            logger.error(f"Failed to process content batch: {e}")
+            return [None] * len(items)
+    
+    def _build_content_document(self, content: str, filename: str) -> Document:
+        """メモリ上のテキストからDocumentを作成"""
+        # UTF-8バイト列の SHA-256 をIDに使う（DocumentService._load_file のファイルハッシュと同じ方式。
+        # このクラスの _load_file は未実装のため、ファイル取り込み時のIDとの一致は保証されない）
+        content_bytes = content.encode("utf-8")
+        content_hash = hashlib.sha256(content_bytes).hexdigest()
+        now = datetime.now()
+        
+        return Document(
+            id=content_hash,
+            title=os.path.basename(filename),
+            content=content,
+            file_path=filename,
+            file_type=Path(filename).suffix.lower(),
+            metadata={
+                "file_size": len(content_bytes),
+                "file_hash": content_hash
+            },
+            created_at=now,
+            updated_at=now
+        )
+    
+    async def _process_document_enhanced(
+        self,
+        document: Document,
+        metadata: Optional[Dict[str, Any]],
+        extract_entities: bool,
+        analyze_sentiment: bool
+    ) -> Optional[str]:
+        """読み込み済みドキュメントの拡張処理"""
+        document_id = await self._prepare_document_enhanced(
+            document, metadata, extract_entities, analyze_sentiment
+        )
+        if not document_id:
             return None
+        
+        # 拡張チャンク処理
+        await self._process_chunks_enhanced(document)
+        
+        await self._finalize_document_enhanced(document)
+        
+        return document_id
+    
+    async def _prepare_document_enhanced(
+        self,
+        document: Document,
+        metadata: Optional[Dict[str, Any]],
+        extract_entities: bool,
+        analyze_sentiment: bool
+    ) -> Optional[str]:
+        """メタデータ付与とドキュメント保存"""
+        # メタデータ設定
+        if metadata:
+            document.metadata.update(metadata)
+        
+        # 拡張メタデータ生成
+        enhanced_metadata = await self._generate_enhanced_metadata(
+            document, extract_entities, analyze_sentiment
+        )
+        document.metadata.update(enhanced_metadata)
+        
+        # ドキュメント保存
+        document_id = await self._save_document(document)
+        if not document_id:
+            logger.error(f"Failed to save document: {document.file_path}")
+            return None
+        
+        return document_id
+    
+    async def _finalize_document_enhanced(self, document: Document):
+        """グラフノード作成と関係性分析"""
+        # 拡張グラフノード作成
+        await self.neo4j_repo.create_document_node(document)
+        
+        # 関係性分析と作成
+        await self._analyze_and_create_relations_enhanced(document)
+        
+        # ドキュメント数が変わるので統計キャッシュを破棄
+        self.invalidate_system_stats()
     
     async def _generate_enhanced_metadata(
         self, 
@@ -194,20 +358,18 @@ class EnhancedDocumentService:
     ) -> Dict[str, Any]:
         """拡張メタデータ生成"""
         try:
-            enhanced_metadata = {}
-            
-            # 感情分析
+            # 感情分析・エンティティ抽出・キーワード抽出は互いに独立しているので並行実行
+            analyses = {}
             if analyze_sentiment:
-                sentiment = await ollama_client.analyze_sentiment(document.content[:1000])
-                enhanced_metadata["sentiment"] = sentiment
-            
-            # エンティティ抽出
+                analyses["sentiment"] = ollama_client.analyze_sentiment(document.content[:1000])
             if extract_entities:
-                entities = await ollama_client.extract_entities(document.content[:2000])
-                enhanced_metadata["entities"] = entities
+                analyses["entities"] = ollama_client.extract_entities(document.content[:2000])
+            analyses["auto_keywords"] = ollama_client.extract_keywords(document.content, max_keywords=15)
             
-            # キーワード抽出
-            keywords = await ollama_client.extract_keywords(document.content, max_keywords=15)
+            enhanced_metadata = dict(zip(analyses, await asyncio.gather(*analyses.values())))
+            
+            # キーワードはタグとしても使う
+            keywords = enhanced_metadata.pop("auto_keywords")
             if keywords:
                 document.tags = keywords
                 enhanced_metadata["auto_keywords"] = keywords
@@ -228,67 +390,83 @@ class EnhancedDocumentService:
     async def _process_chunks_enhanced(self, document: Document):
         """拡張チャンク処理"""
         try:
-            # LlamaIndexドキュメント作成
-            li_document = LIDocument(
-                text=document.content, 
-                doc_id=document.id,
-                metadata=document.metadata
-            )
-            
-            # チャンク化（拡張パーサー使用）
-            nodes = self.node_parser.get_nodes_from_documents([li_document])
-            
-            # エンベディング生成（バッチ処理）
+            # チャンク化
+            nodes = await self._split_document(document)
+
+            # エンベディング生成（/api/embed へまとめて送信）
             texts = [node.text for node in nodes]
-            embeddings = await ollama_client.generate_embeddings_batch(texts, batch_size=5)
-            
-            # DocumentChunk作成
-            chunks = []
-            enhanced_nodes = []
-            
-            for i, (node, embedding) in enumerate(zip(nodes, embeddings)):
-                if embedding:
-                    # チャンクメタデータ強化
-                    chunk_metadata = {
-                        "start_char_idx": node.start_char_idx,
-                        "end_char_idx": node.end_char_idx,
-                        "chunk_length": len(node.text),
-                        "word_count": len(node.text.split()),
-                        **node.metadata
-                    }
-                    
-                    chunk = DocumentChunk(
-                        id=f"{document.id}_chunk_{i}",
-                        document_id=document.id,
-                        content=node.text,
-                        chunk_index=i,
-                        metadata=chunk_metadata,
-                        embedding=embedding
-                    )
-                    chunks.append(chunk)
-                    
-                    # TextNode作成（LlamaIndex用）
-                    enhanced_node = TextNode(
-                        id_=chunk.id,
-                        text=node.text,
-                        metadata=chunk_metadata,
-                        embedding=embedding
-                    )
-                    enhanced_nodes.append(enhanced_node)
-            
-            # Milvusに保存
-            if chunks:
-                await self.milvus_repo.insert_vectors(chunks)
-            
-            # ベクトルインデックス更新
-            if enhanced_nodes and self.vector_index:
-                self.vector_index.insert_nodes(enhanced_nodes)
-            
+            embeddings = await ollama_client.embed_batch(texts, batch_size=EMBED_REQUEST_BATCH_SIZE)
+
+            # DocumentChunk作成と保存
+            chunks, enhanced_nodes = self._build_enhanced_chunks(document, nodes, embeddings)
+            await self._store_enhanced_chunks(chunks, enhanced_nodes)
+
             logger.info(f"Processed {len(chunks)} enhanced chunks for document {document.id}")
-            
+
         except Exception as e:
             logger.error(f"Failed to process enhanced chunks: {e}")
-    
+
+    async def _split_document(self, document: Document) -> List[Any]:
+        """ドキュメントをノードに分割（拡張パーサー使用、CPU処理なのでスレッドで実行）"""
+        li_document = LIDocument(
+            text=document.content,
+            doc_id=document.id,
+            metadata=document.metadata
+        )
+        return await asyncio.to_thread(self.node_parser.get_nodes_from_documents, [li_document])
+
+    def _build_enhanced_chunks(
+        self,
+        document: Document,
+        nodes: List[Any],
+        embeddings: List[Optional[List[float]]]
+    ) -> Tuple[List[DocumentChunk], List[TextNode]]:
+        """ノードとエンベディングからDocumentChunkとTextNodeを作成"""
+        chunks = []
+        enhanced_nodes = []
+
+        for i, (node, embedding) in enumerate(zip(nodes, embeddings)):
+            if embedding:
+                # チャンクメタデータ強化
+                chunk_metadata = {
+                    "start_char_idx": node.start_char_idx,
+                    "end_char_idx": node.end_char_idx,
+                    "chunk_length": len(node.text),
+                    "word_count": len(node.text.split()),
+                    **node.metadata
+                }
+
+                chunk = DocumentChunk(
+                    id=f"{document.id}_chunk_{i}",
+                    document_id=document.id,
+                    content=node.text,
+                    chunk_index=i,
+                    metadata=chunk_metadata,
+                    embedding=embedding
+                )
+                chunks.append(chunk)
+
+                # TextNode作成（LlamaIndex用）
+                enhanced_node = TextNode(
+                    id_=chunk.id,
+                    text=node.text,
+                    metadata=chunk_metadata,
+                    embedding=embedding
+                )
+                enhanced_nodes.append(enhanced_node)
+
+        return chunks, enhanced_nodes
+
+    async def _store_enhanced_chunks(self, chunks: List[DocumentChunk], enhanced_nodes: List[TextNode]):
+        """チャンクをMilvusとベクトルインデックスに保存"""
+        # Milvusに保存
+        if chunks:
+            await self.milvus_repo.insert_vectors(chunks)
+
+        # ベクトルインデックス更新
+        if enhanced_nodes and self.vector_index:
+            self.vector_index.insert_nodes(enhanced_nodes)
+
     async def intelligent_search(
         self, 
         query: str, 
@@ -306,15 +484,16 @@ class EnhancedDocumentService:
                 limit = sys_config.VECTOR_SEARCH_TOP_K
             
             # キャッシュキー生成
-            cache_key = f"intelligent_search:{hashlib.md5(query.encode()).hexdigest()}:{search_type}:{include_metadata}:{rerank}:{limit}"
+            cache_key = f"intelligent_search:{hashlib.sha256(query.encode()).hexdigest()}:{search_type}:{include_metadata}:{rerank}:{limit}"
             
             # キャッシュ確認
-            cached_results = await self.redis_repo.get(cache_key)
+            cached_results = await self.redis_repo.get_bytes(cache_key)
             if cached_results:
                 logger.info("Returning cached intelligent search results")
-                return cached_results
+                return [SearchResult.from_dict(result) for result in orjson.loads(cached_results)]
             
             results = []
+            vector_results = []
             
             # LlamaIndexクエリエンジン使用
             if search_type in ["vector", "hybrid"] and self.query_engine:
@@ -331,14 +510,19 @@ class EnhancedDocumentService:
             
             # リランキング
             if rerank and len(results) > 1:
-                results = await self._rerank_results(query, results)
+                results = await self._rerank_results(query, results, vector_results)
             
             # メタデータ強化
             if include_metadata:
                 results = await self._enhance_search_results_metadata(results)
             
-            # 結果をキャッシュ
-            await self.redis_repo.set(cache_key, results, expire_time=300)
+            # 結果をキャッシュ（orjsonはdataclassをそのままシリアライズする。失敗しても結果は返す）
+            await self.redis_repo.set_orjson(
+                cache_key,
+                results,
+                expire_time=300,
+                option=orjson.OPT_SERIALIZE_NUMPY
+            )
             
             logger.info(f"Found {len(results)} intelligent search results for query: {query}")
             return results
@@ -372,37 +556,60 @@ class EnhancedDocumentService:
             logger.error(f"Failed to perform LlamaIndex search: {e}")
             return []
     
-    async def _rerank_results(self, query: str, results: List[SearchResult]) -> List[SearchResult]:
-        """結果リランキング"""
+    async def _rerank_results(
+        self,
+        query: str,
+        results: List[SearchResult],
+        vector_results: Optional[List[SearchResult]] = None
+    ) -> List[SearchResult]:
+        """結果リランキング
+
+        ベクトル検索の結果はMilvusが保存済みベクトルとクエリのコサイン類似度を
+        スコアとして返しているため、そのまま使い再エンベディングしない。
+        それ以外の結果だけをエンベディングしてスコアを揃える。
+        """
         try:
-            # クエリエンベディング生成
-            query_embedding = await ollama_client.generate_embedding(query)
-            if not query_embedding:
-                return results
-            
-            # 各結果のスコア再計算
-            reranked_results = []
-            for result in results:
-                # コンテンツエンベディング生成
-                content_embedding = await ollama_client.generate_embedding(result.content)
-                if content_embedding:
-                    # コサイン類似度計算
-                    import numpy as np
-                    similarity = np.dot(query_embedding, content_embedding) / (
-                        np.linalg.norm(query_embedding) * np.linalg.norm(content_embedding)
-                    )
-                    result.score = float(similarity)
+            milvus_scored = {id(result) for result in vector_results or []}
+            unscored = [i for i, result in enumerate(results) if id(result) not in milvus_scored]
+            
+            if unscored:
+                # クエリエンベディング生成
+                query_embedding = await ollama_client.generate_embedding(query)
+                if not query_embedding:
+                    return results
                 
-                reranked_results.append(result)
+                # コンテンツエンベディングを /api/embed の1リクエストでまとめて生成
+                content_embeddings = await ollama_client.embed_batch([results[i].content for i in unscored])
+                self._score_by_embeddings(results, unscored, query_embedding, content_embeddings)
             
-            # スコア順ソート
-            reranked_results.sort(key=lambda x: x.score, reverse=True)
-            return reranked_results[:sys_config.RERANK_TOP_K]
+            # スコア順に上位のみ取り出す（同点は元の順序を維持）
+            scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+            top_indices = np.argsort(-scores, kind="stable")[:sys_config.RERANK_TOP_K]
+            return [results[i] for i in top_indices]
             
         except Exception as e:
             logger.error(f"Failed to rerank results: {e}")
             return results
     
+    @staticmethod
+    def _score_by_embeddings(
+        results: List[SearchResult],
+        indices: List[int],
+        query_embedding: List[float],
+        content_embeddings: List[Optional[List[float]]]
+    ):
+        """エンベディングとクエリのコサイン類似度を results[indices] のスコアに設定"""
+        # エンベディングが得られた結果をまとめ、正規化済み行列との1回の積でコサイン類似度を計算
+        embedded = [(i, embedding) for i, embedding in zip(indices, content_embeddings) if embedding]
+        if embedded:
+            matrix = np.asarray([embedding for _, embedding in embedded], dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_vector /= np.linalg.norm(query_vector) + 1e-9
+            
+            for (i, _), score in zip(embedded, (matrix @ query_vector).tolist()):
+                results[i].score = score
+    
     async def _enhance_search_results_metadata(self, results: List[SearchResult]) -> List[SearchResult]:
         """検索結果メタデータ強化"""
         try:
@@ -430,6 +637,26 @@ class EnhancedDocumentService:
             logger.error(f"Failed to enhance search results metadata: {e}")
             return results
     
+    async def _get_query_embedding(self, text: str) -> Optional[List[float]]:
+        """クエリエンベディング取得（float32のバイト列としてRedisにキャッシュ）
+
+        キーにエンベディングモデル名を含め、モデル変更時に古いベクトルを使わない。
+        """
+        cache_key = f"qemb:{ollama_client.embedding_model}:{hashlib.sha256(text.encode()).hexdigest()}"
+        
+        cached = await self.redis_repo.get_bytes(cache_key)
+        if cached:
+            return np.frombuffer(cached, dtype=np.float32).tolist()
+        
+        embedding = await ollama_client.generate_embedding(text)
+        if embedding:
+            await self.redis_repo.set_bytes(
+                cache_key,
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+                expire_time=QUERY_EMBEDDING_CACHE_TTL
+            )
+        return embedding
+    
     async def search_by_prompt(
         self, 
         prompt: str, 
@@ -441,8 +668,8 @@ class EnhancedDocumentService:
         try:
             logger.info(f"Searching documents by prompt: {prompt}")
             
-            # 1. プロンプトのエンベディング生成
-            prompt_embedding = await ollama_client.generate_embedding(prompt)
+            # 1. プロンプトのエンベディング生成（Redisキャッシュ優先）
+            prompt_embedding = await self._get_query_embedding(prompt)
             if not prompt_embedding:
                 logger.error("Failed to generate prompt embedding")
                 return []
@@ -500,16 +727,15 @@ class EnhancedDocumentService:
         """高度な類似ドキュメント検索"""
         try:
             # キャッシュキー生成
-            import hashlib
-            cache_key = f"similar_docs:{hashlib.md5(reference_text.encode()).hexdigest()}"
+            cache_key = f"similar_docs:{hashlib.sha256(reference_text.encode()).hexdigest()}"
             
             # キャッシュ確認
             cached_results = await self.redis_repo.get(cache_key)
             if cached_results:
                 return cached_results
             
-            # エンベディング生成
-            reference_embedding = await ollama_client.generate_embedding(reference_text)
+            # エンベディング生成（Redisキャッシュ優先）
+            reference_embedding = await self._get_query_embedding(reference_text)
             if not reference_embedding:
                 return []
             
@@ -623,18 +849,27 @@ class EnhancedDocumentService:
         top_scores = [result.score for result in results[:3]]
         return sum(top_scores) / len(top_scores)
     
+    def invalidate_system_stats(self):
+        """システム統計キャッシュの破棄"""
+        self._system_stats_cache = None
+    
     async def get_enhanced_system_stats(self) -> Dict[str, Any]:
-        """拡張システム統計"""
+        """拡張システム統計（SYSTEM_STATS_CACHE_TTL 秒以内の再取得はキャッシュを返す）"""
+        if self._system_stats_cache is not None:
+            fetched_at, cached_stats = self._system_stats_cache
+            if time.monotonic() - fetched_at < SYSTEM_STATS_CACHE_TTL:
+                return cached_stats
+        
         try:
             base_stats = await self.get_system_stats()
             
             # Ollama統計追加
             ollama_stats = await ollama_client.get_performance_stats()
             
-            # Neo4j拡張統計
-            neo4j_enhanced_stats = await self.neo4j_repo.get_enhanced_graph_stats()
+            # Neo4j拡張統計（基本統計で取得済みのものを再利用し、二重に問い合わせない）
+            neo4j_enhanced_stats = base_stats.get("neo4j") or {}
             
-            return {
+            stats = {
                 **base_stats,
                 "ollama_performance": ollama_stats,
                 "neo4j_enhanced": neo4j_enhanced_stats,
@@ -644,6 +879,8 @@ class EnhancedDocumentService:
                     "retriever_ready": self.retriever is not None
                 }
             }
+            self._system_stats_cache = (time.monotonic(), stats)
+            return stats
             
         except Exception as e:
             logger.error(f"Failed to get enhanced system stats: {e}")
@@ -693,10 +930,21 @@ class EnhancedDocumentService:
         pass
     
     async def _merge_search_results(self, results: List[SearchResult]) -> List[SearchResult]:
-        """検索結果マージ（基本実装を使用）"""
-        # document_service.pyの実装をコピー
-        # ...existing code...
-        pass
+        """検索結果マージ"""
+        try:
+            # ドキュメントごとに最高スコアの結果だけを残す（1パス）
+            best_results: Dict[str, SearchResult] = {}
+            for result in results:
+                best = best_results.get(result.document_id)
+                if best is None or result.score > best.score:
+                    best_results[result.document_id] = result
+            
+            # 上位K件だけをヒープで取り出す（全件ソートしない）
+            return heapq.nlargest(sys_config.RERANK_TOP_K, best_results.values(), key=attrgetter("score"))
+            
+        except Exception as e:
+            logger.error(f"Failed to merge search results: {e}")
+            return results
     
     async def _analyze_and_create_relations_enhanced(self, document: Document):
         """拡張関係性分析"""
@@ -711,7 +959,8 @@ class EnhancedDocumentService:
                 self.milvus_repo.disconnect(),
                 self.mongo_repo.disconnect(),
                 self.neo4j_repo.disconnect(),
-                self.redis_repo.disconnect()
+                self.redis_repo.disconnect(),
+                ollama_client.aclose()
             ]
             
             await asyncio.gather(*tasks, return_exceptions=True)
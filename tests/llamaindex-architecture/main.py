@@ -167,8 +167,7 @@ async def create_sample_documents(service: DocumentService):
             file_path = project_root / file_info["filename"]
             
             # ファイル作成
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(file_info["content"])
+            await asyncio.to_thread(file_path.write_text, file_info["content"], encoding="utf-8")
             
             # ドキュメント処理
             document_id = await service.process_file(str(file_path), file_info["metadata"])
@@ -179,8 +178,7 @@ async def create_sample_documents(service: DocumentService):
                 logger.error(f"  ❌ Failed: {file_info['filename']}")
             
             # ファイル削除（クリーンアップ）
-            if file_path.exists():
-                file_path.unlink()
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
         
         logger.info("📝 Sample documents created successfully\n")
         
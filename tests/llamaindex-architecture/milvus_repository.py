@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List, Optional, Dict, Any
 from llama_index.vector_stores.milvus import MilvusVectorStore
@@ -112,8 +113,8 @@ class MilvusRepository(VectorRepository):
                 logger.warning("No valid chunks with embeddings to insert")
                 return False
             
-            # ベクトルストアに追加
-            self.vector_store.add(nodes)
+            # ベクトルストアに追加（同期APIなのでスレッドで実行）
+            await asyncio.to_thread(self.vector_store.add, nodes)
             
             logger.info(f"Inserted {len(nodes)} vectors into Milvus")
             return True
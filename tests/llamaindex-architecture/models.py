@@ -46,6 +46,11 @@ class SearchResult:
     score: float
     metadata: Dict[str, Any]
     document_title: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchResult":
+        """キャッシュから復元した辞書をSearchResultに変換"""
+        return cls(**data)
 
 @dataclass
 class DocumentRelation:
@@ -281,6 +281,35 @@ class MongoRepository(DocumentRepository):
             logger.error(f"Failed to get documents by IDs: {e}")
             return []
     
+    async def get_document_titles(self, document_ids: List[str]) -> Dict[str, str]:
+        """複数ドキュメントのタイトル取得（titleのみ射影して1クエリで取得）"""
+        try:
+            if not self.collection:
+                await self.connect()
+            
+            cursor = self.collection.find({"_id": {"$in": document_ids}}, {"title": 1})
+            return {doc_dict["_id"]: doc_dict["title"] async for doc_dict in cursor}
+            
+        except Exception as e:
+            logger.error(f"Failed to get document titles: {e}")
+            return {}
+    
+    async def get_document_excerpts(self, limit: int, length: int) -> Dict[str, str]:
+        """ドキュメント本文の先頭部分取得（切り出しはサーバー側で実行）"""
+        try:
+            if not self.collection:
+                await self.connect()
+            
+            cursor = self.collection.aggregate([
+                {"$limit": limit},
+                {"$project": {"excerpt": {"$substrCP": ["$content", 0, length]}}}
+            ])
+            return {doc_dict["_id"]: doc_dict["excerpt"] async for doc_dict in cursor}
+            
+        except Exception as e:
+            logger.error(f"Failed to get document excerpts: {e}")
+            return {}
+    
     async def get_collection_stats(self) -> dict:
         """コレクション統計取得"""
         try:
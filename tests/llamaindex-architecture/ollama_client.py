@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 from typing import List, Optional, Dict, Any
 import httpx
 from llama_index.embeddings.ollama import OllamaEmbedding
@@ -17,11 +18,15 @@ class EnhancedOllamaClient:
         self.base_url = db_config.OLLAMA_BASE_URL
         self.model = db_config.OLLAMA_MODEL
         self.embedding_model = db_config.OLLAMA_EMBEDDING_MODEL
+        self.max_inflight = max(1, db_config.OLLAMA_MAX_INFLIGHT)
         
         # LlamaIndex エンベディング
         self.embedding_client = None
         self.llm_client = None
         
+        # temperature別のLLMクライアント（共有クライアントの設定を書き換えない）
+        self._llm_clients: Dict[float, Ollama] = {}
+        
         # LangChain エンベディング（代替）
         self.langchain_embedding = None
         
@@ -37,6 +42,52 @@ class EnhancedOllamaClient:
         self.embedding_cache = {}
         self.max_cache_size = 1000
         
+        # Ollama REST API用の共有HTTPクライアント（接続を使い回す）
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # エンベディング・テキスト生成リクエストの同時実行数制限
+        # （並行実行でOllamaサーバーが過負荷にならないように）
+        self._request_semaphore = asyncio.Semaphore(self.max_inflight)
+        self._inflight_requests = 0
+        self._queued_requests = 0
+        self._peak_inflight_requests = 0
+        self._peak_queued_requests = 0
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """共有HTTPクライアント取得（初回アクセス時に作成）"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                timeout=60.0
+            )
+        return self._http_client
+    
+    @asynccontextmanager
+    async def _request_slot(self):
+        """Ollamaへのリクエスト枠を確保（実行中・待機中の数を記録）"""
+        self._queued_requests += 1
+        self._peak_queued_requests = max(self._peak_queued_requests, self._queued_requests)
+        try:
+            await self._request_semaphore.acquire()
+        finally:
+            self._queued_requests -= 1
+        
+        self._inflight_requests += 1
+        self._peak_inflight_requests = max(self._peak_inflight_requests, self._inflight_requests)
+        try:
+            yield
+        finally:
+            self._inflight_requests -= 1
+            self._request_semaphore.release()
+    
+    async def aclose(self):
+        """共有HTTPクライアントのクローズ"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        
     async def initialize(self) -> bool:
         """クライアント初期化"""
         try:
@@ -56,12 +107,8 @@ class EnhancedOllamaClient:
             )
             
             # LLMクライアント初期化
-            self.llm_client = Ollama(
-                model=self.model,
-                base_url=self.base_url,
-                temperature=0.1,
-                request_timeout=60.0
-            )
+            self._llm_clients.clear()
+            self.llm_client = self._get_llm_client(0.1)
             
             # モデルの可用性確認
             await self._check_model_availability()
@@ -75,20 +122,19 @@ class EnhancedOllamaClient:
     
     async def _check_model_availability(self):
         """モデルの可用性確認"""
-        async with httpx.AsyncClient() as client:
-            # 利用可能なモデル一覧取得
-            response = await client.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                model_names = [model.get("name") for model in models]
-                
-                # 必要なモデルが存在するか確認
-                if self.model not in model_names:
-                    logger.warning(f"LLM model {self.model} not found in Ollama")
-                if self.embedding_model not in model_names:
-                    logger.warning(f"Embedding model {self.embedding_model} not found in Ollama")
-            else:
-                logger.error(f"Failed to check Ollama models: {response.status_code}")
+        # 利用可能なモデル一覧取得
+        response = await self.http_client.get("/api/tags")
+        if response.status_code == 200:
+            models = response.json().get("models", [])
+            model_names = [model.get("name") for model in models]
+            
+            # 必要なモデルが存在するか確認
+            if self.model not in model_names:
+                logger.warning(f"LLM model {self.model} not found in Ollama")
+            if self.embedding_model not in model_names:
+                logger.warning(f"Embedding model {self.embedding_model} not found in Ollama")
+        else:
+            logger.error(f"Failed to check Ollama models: {response.status_code}")
     
     
     async def generate_embedding(self, text: str, use_cache: bool = True) -> Optional[List[float]]:
@@ -99,7 +145,10 @@ class EnhancedOllamaClient:
                 cache_key = hash(text)
                 if cache_key in self.embedding_cache:
                     self.stats["cache_hits"] += 1
-                    return self.embedding_cache[cache_key]
+                    # 末尾へ移動して挿入順を参照順（LRU）として扱う
+                    embedding = self.embedding_cache.pop(cache_key)
+                    self.embedding_cache[cache_key] = embedding
+                    return embedding
                 else:
                     self.stats["cache_misses"] += 1
             
@@ -107,22 +156,17 @@ class EnhancedOllamaClient:
                 await self.initialize()
             
             # エンベディング生成
-            try:
-                embedding = await self.embedding_client.aget_text_embedding(text)
-            except Exception as e:
-                # LlamaIndexが失敗した場合、LangChainを試行
-                logger.warning(f"LlamaIndex embedding failed, trying LangChain: {e}")
-                embedding = await self.langchain_embedding.aget_text_embedding(text)
+            async with self._request_slot():
+                try:
+                    embedding = await self.embedding_client.aget_text_embedding(text)
+                except Exception as e:
+                    # LlamaIndexが失敗した場合、LangChainを試行
+                    logger.warning(f"LlamaIndex embedding failed, trying LangChain: {e}")
+                    embedding = await self.langchain_embedding.aget_text_embedding(text)
             
             # キャッシュ保存
             if use_cache and embedding:
-                if len(self.embedding_cache) >= self.max_cache_size:
-                    # 古いエントリを削除
-                    oldest_key = next(iter(self.embedding_cache))
-                    del self.embedding_cache[oldest_key]
-                
-                cache_key = hash(text)
-                self.embedding_cache[cache_key] = embedding
+                self._cache_embedding(text, embedding)
             
             self.stats["embeddings_generated"] += 1
             return embedding
@@ -131,37 +175,124 @@ class EnhancedOllamaClient:
             logger.error(f"Failed to generate embedding: {e}")
             return None
     
+    def _cache_embedding(self, text: str, embedding: List[float]):
+        """エンベディングをキャッシュに保存"""
+        if len(self.embedding_cache) >= self.max_cache_size:
+            # 最も長く参照されていないエントリを削除
+            oldest_key = next(iter(self.embedding_cache))
+            del self.embedding_cache[oldest_key]
+        
+        self.embedding_cache[hash(text)] = embedding
+    
+    async def prime_embeddings(self, texts: List[str]) -> int:
+        """未キャッシュのテキストを1リクエストでまとめてエンベディングし、キャッシュに格納
+
+        以降の generate_embedding はキャッシュから返るため、同じテキストを
+        何度も個別にリクエストしなくて済む。格納した件数を返す。
+        """
+        pending = list(dict.fromkeys(text for text in texts if hash(text) not in self.embedding_cache))
+        if not pending:
+            return 0
+        
+        embeddings = await self.embed_batch(pending)
+        
+        primed = 0
+        for text, embedding in zip(pending, embeddings):
+            if embedding:
+                self._cache_embedding(text, embedding)
+                primed += 1
+        return primed
+    
     async def generate_embeddings_batch(self, texts: List[str], batch_size: int = 10) -> List[Optional[List[float]]]:
-        """バッチでエンベディング生成（最適化版）"""
+        """バッチでエンベディング生成（最適化版）
+
+        batch_size は同時に投げるリクエスト数の上限。バッチ単位で待ち合わせず、
+        セマフォで並列度だけを制限して全件を一度に投入する。
+        """
         try:
             if not self.embedding_client:
                 await self.initialize()
             
-            embeddings = []
+            semaphore = asyncio.Semaphore(max(1, batch_size))
             
-            # バッチ処理
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                batch_embeddings = []
-                
-                # 並行処理でバッチ内のエンベディング生成
-                tasks = [self.generate_embedding(text) for text in batch]
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        logger.error(f"Batch embedding error: {result}")
-                        batch_embeddings.append(None)
-                    else:
-                        batch_embeddings.append(result)
-                
-                embeddings.extend(batch_embeddings)
+            async def _embed(text: str) -> Optional[List[float]]:
+                async with semaphore:
+                    return await self.generate_embedding(text)
+            
+            results = await asyncio.gather(*(_embed(text) for text in texts), return_exceptions=True)
+            
+            embeddings = []
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Batch embedding error: {result}")
+                    embeddings.append(None)
+                else:
+                    embeddings.append(result)
             
             return embeddings
             
         except Exception as e:
             logger.error(f"Failed to generate batch embeddings: {e}")
             return [None] * len(texts)
+
+    async def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[Optional[List[float]]]:
+        """/api/embed に複数テキストをまとめて送り、エンベディング生成
+
+        batch_size を指定すると、その件数ずつのリクエストに分けて並行送信する
+        （同時実行数は _request_slot で制限される）。戻り値の順序は texts と同じ。
+        """
+        if not texts:
+            return []
+
+        if batch_size and len(texts) > batch_size:
+            parts = await asyncio.gather(*(
+                self._embed_request(texts[start:start + batch_size])
+                for start in range(0, len(texts), batch_size)
+            ))
+            return [embedding for part in parts for embedding in part]
+
+        return await self._embed_request(texts)
+
+    async def _embed_request(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """/api/embed への1リクエスト
+
+        失敗時はテキスト単位の generate_embeddings_batch にフォールバックする。
+        """
+        try:
+            async with self._request_slot():
+                response = await self.http_client.post(
+                    "/api/embed",
+                    json={"model": self.embedding_model, "input": texts}
+                )
+            response.raise_for_status()
+            embeddings = response.json()["embeddings"]
+
+            if len(embeddings) != len(texts):
+                raise ValueError(f"expected {len(texts)} embeddings, got {len(embeddings)}")
+
+            self.stats["embeddings_generated"] += len(embeddings)
+            return embeddings
+
+        except Exception as e:
+            logger.warning(f"Bulk embedding request failed, falling back to per-text requests: {e}")
+            return await self.generate_embeddings_batch(texts)
+
+    def _get_llm_client(self, temperature: float) -> Ollama:
+        """指定temperatureのLLMクライアント取得（初回のみ作成）
+
+        並行実行中のリクエストが互いの設定を変えないよう、temperatureごとに
+        別のクライアントを使う。
+        """
+        client = self._llm_clients.get(temperature)
+        if client is None:
+            client = Ollama(
+                model=self.model,
+                base_url=self.base_url,
+                temperature=temperature,
+                request_timeout=60.0
+            )
+            self._llm_clients[temperature] = client
+        return client
     
     async def generate_text(self, prompt: str, max_tokens: int = 512, temperature: float = 0.1) -> Optional[str]:
         """テキスト生成（パラメータ調整可能）"""
@@ -169,17 +300,13 @@ class EnhancedOllamaClient:
             if not self.llm_client:
                 await self.initialize()
             
-            # 一時的にtemperatureを設定
-            original_temp = self.llm_client.temperature
-            self.llm_client.temperature = temperature
-            
-            response = await self.llm_client.acomplete(
-                prompt=prompt,
-                max_tokens=max_tokens
-            )
+            llm_client = self._get_llm_client(temperature)
             
-            # temperatureを元に戻す
-            self.llm_client.temperature = original_temp
+            async with self._request_slot():
+                response = await llm_client.acomplete(
+                    prompt=prompt,
+                    max_tokens=max_tokens
+                )
             
             self.stats["text_generated"] += 1
             return response.text
@@ -270,14 +397,32 @@ class EnhancedOllamaClient:
         return {
             **self.stats,
             "cache_size": len(self.embedding_cache),
+            "max_inflight": self.max_inflight,
+            "inflight_requests": self._inflight_requests,
+            "queued_requests": self._queued_requests,
+            "peak_inflight_requests": self._peak_inflight_requests,
+            "peak_queued_requests": self._peak_queued_requests,
             "cache_hit_ratio": self.stats["cache_hits"] / max(1, self.stats["cache_hits"] + self.stats["cache_misses"])
         }
     
     async def clear_cache(self):
-        """キャッシュクリア"""
-        self.embedding_cache.clear()
+        """キャッシュクリア
+
+        新しい辞書に差し替え、古い辞書の解放はスレッドで行う
+        （大量のエンベディングの解放でイベントループを止めない）。
+        """
+        old_cache, self.embedding_cache = self.embedding_cache, {}
+        await asyncio.to_thread(old_cache.clear)
         logger.info("Embedding cache cleared")
     
+    def evict_lru(self, count: int) -> int:
+        """最も長く参照されていないエントリを最大count件削除（全削除より穏やかな代替）"""
+        evicted = 0
+        while evicted < count and self.embedding_cache:
+            del self.embedding_cache[next(iter(self.embedding_cache))]
+            evicted += 1
+        return evicted
+    
     async def warm_up_models(self) -> bool:
         """モデルウォームアップ"""
         try:
@@ -368,9 +513,8 @@ class EnhancedOllamaClient:
     async def health_check(self) -> bool:
         """ヘルスチェック"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/api/tags", timeout=5.0)
-                return response.status_code == 200
+            response = await self.http_client.get("/api/tags", timeout=5.0)
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Ollama health check failed: {e}")
             return False
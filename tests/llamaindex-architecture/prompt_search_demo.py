@@ -237,8 +237,7 @@ Android開発：
         for file_info in search_samples:
             file_path = project_root / file_info["filename"]
             
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(file_info["content"])
+            await asyncio.to_thread(file_path.write_text, file_info["content"], encoding="utf-8")
             
             document_id = await service.process_file_enhanced(
                 str(file_path), 
@@ -251,8 +250,7 @@ Android開発：
                 logger.info(f"  ✅ Created: {file_info['filename']}")
             
             # クリーンアップ
-            if file_path.exists():
-                file_path.unlink()
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
         
         logger.info("📝 Search sample documents created\n")
         
@@ -3,6 +3,7 @@ import json
 import pickle
 from typing import Any, Optional
 import aioredis
+import orjson
 from models import CacheRepository
 from config import db_config
 
@@ -110,6 +111,50 @@ class RedisRepository(CacheRepository):
             logger.error(f"Failed to set cache: {e}")
             return False
     
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """キャッシュ取得（デシリアライズせずバイト列のまま返す）"""
+        try:
+            if not self.redis:
+                await self.connect()
+            
+            return await self.redis.get(key)
+            
+        except Exception as e:
+            logger.error(f"Failed to get cache bytes: {e}")
+            return None
+    
+    async def set_bytes(self, key: str, value: bytes, expire_time: int = None) -> bool:
+        """キャッシュ設定（シリアライズ済みのバイト列をそのまま保存）"""
+        try:
+            if not self.redis:
+                await self.connect()
+            
+            if expire_time is None:
+                expire_time = self.expire_time
+            
+            await self.redis.setex(key, expire_time, value)
+            
+            logger.debug(f"Set cache bytes: {key}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to set cache bytes: {e}")
+            return False
+    
+    async def set_orjson(self, key: str, value: Any, expire_time: int = None, option: int = 0) -> bool:
+        """orjsonでシリアライズしてキャッシュ設定
+
+        JSON化できない値は文字列に変換する。それでもシリアライズできない場合は
+        キャッシュ書き込みをスキップするだけで例外は送出しない。
+        """
+        try:
+            serialized_value = orjson.dumps(value, default=str, option=option)
+        except (orjson.JSONEncodeError, TypeError) as e:
+            logger.warning(f"Skipped caching {key}: {e}")
+            return False
+        
+        return await self.set_bytes(key, serialized_value, expire_time=expire_time)
+    
     async def delete(self, key: str) -> bool:
         """キャッシュ削除"""
         try:
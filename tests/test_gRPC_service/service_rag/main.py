@@ -5,6 +5,7 @@ import sys
 import os
 from typing import List, Dict, Any
 import json
+import hashlib
 import numpy as np
 
 # Add proto path
@@ -70,6 +71,28 @@ class RAGServiceImpl(mcp_service_pb2_grpc.RAGServiceServicer):
             logger.warning(f"Could not load embedding model: {e}")
             self.embedding_model = None
     
+    def _encode_query(self, query):
+        """Encode a query, using Redis as a cache for repeated queries"""
+        key = 'emb:' + hashlib.sha256(query.encode()).hexdigest()
+        
+        if self.redis_client:
+            try:
+                cached = self.redis_client.get(key)
+                if cached:
+                    return np.frombuffer(cached, dtype=np.float32).tolist()
+            except Exception as e:
+                logger.warning(f"Could not read embedding cache: {e}")
+        
+        query_embedding = self.embedding_model.encode([query])[0]
+        
+        if self.redis_client:
+            try:
+                self.redis_client.set(key, np.asarray(query_embedding, dtype=np.float32).tobytes(), ex=3600)
+            except Exception as e:
+                logger.warning(f"Could not write embedding cache: {e}")
+        
+        return query_embedding.tolist()
+    
     async def HealthCheck(self, request, context):
         """Health check endpoint"""
         return mcp_service_pb2.HealthCheckResponse(
@@ -102,11 +125,10 @@ class RAGServiceImpl(mcp_service_pb2_grpc.RAGServiceServicer):
                 else:
                     continue
                 
-                all_results.extend(results)
+                # Normalize per backend so every backend's scores share the [0, 1] range
+                all_results.extend(self._normalize_scores(results))
             
-            # Sort results by score and limit to top_k
-            all_results.sort(key=lambda x: x.score, reverse=True)
-            final_results = all_results[:top_k]
+            final_results = self._select_top_k(all_results, top_k)
             
             logger.info(f"Found {len(final_results)} results")
             
@@ -124,6 +146,37 @@ class RAGServiceImpl(mcp_service_pb2_grpc.RAGServiceServicer):
                 message=f"Error searching documents: {str(e)}"
             )
     
+    def _normalize_scores(self, results):
+        """Min-max normalize the scores of a single backend's results to [0, 1]"""
+        if not results:
+            return results
+        
+        scores = np.fromiter((r.score for r in results), dtype=np.float32, count=len(results))
+        low, high = scores.min(), scores.max()
+        if high > low:
+            scores = (scores - low) / (high - low)
+        else:
+            # Constant-score backends (fixed key-value/graph scores) map to the top of
+            # the same range instead of keeping their raw values
+            scores = np.ones_like(scores)
+        
+        for result, score in zip(results, scores):
+            result.score = float(score)
+        return results
+    
+    def _select_top_k(self, all_results, top_k):
+        """Pick the top_k results by score without a full Python-level sort"""
+        if not all_results:
+            return []
+        
+        scores = np.fromiter((r.score for r in all_results), dtype=np.float32, count=len(all_results))
+        if top_k < len(all_results):
+            idx = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            idx = np.arange(len(all_results))
+        idx = idx[np.argsort(-scores[idx], kind='stable')]
+        return [all_results[i] for i in idx]
+    
     async def _search_vector(self, query, top_k, config):
         """Search in Milvus vector database"""
         if not self.milvus_connected or not self.embedding_model:
@@ -134,7 +187,7 @@ class RAGServiceImpl(mcp_service_pb2_grpc.RAGServiceServicer):
             collection = Collection(collection_name)
             
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query])[0].tolist()
+            query_embedding = self._encode_query(query)
             
             # Search
             search_params = {